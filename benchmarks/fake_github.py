@@ -0,0 +1,255 @@
+"""Local stand-in for the GitHub REST API and raw.githubusercontent.com.
+
+Serves deterministic synthetic repositories of configurable size so the
+explorer can be benchmarked offline. Point a GitHubClient at it with
+``GitHubClient(url_rewrites=server.url_rewrites)``.
+"""
+import hashlib
+import io
+import json
+import re
+import tarfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+RATE_LIMIT = 5000
+
+
+def git_blob_sha(data):
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _sha(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class SyntheticRepo:
+    """Deterministic repository with `entries` tree entries.
+
+    Roughly 40% of the blobs are .py files of `file_lines` lines and 10% are
+    notebooks with `notebook_cells` code cells; the rest are other files that
+    the explorer filters out. Files are spread over `dirs` x `subdirs`
+    directories.
+    """
+
+    def __init__(self, owner="bench", name="repo", entries=1000, file_lines=200,
+                 notebook_cells=40, dirs=50, subdirs=20, branch="main"):
+        self.owner = owner
+        self.name = name
+        self.branch = branch
+        self.file_lines = file_lines
+        self.notebook_cells = notebook_cells
+        self.commit_sha = _sha(f"commit:{owner}/{name}:{entries}")
+        self.files = {}          # path -> blob sha
+        self.children = {"": {}}  # dir -> {name: (type, sha)}
+        for i in range(entries):
+            kind = i % 10
+            ext = ".py" if kind < 4 else ".ipynb" if kind == 4 else ".md"
+            path = f"pkg_{i % dirs}/mod_{(i // dirs) % subdirs}/file_{i}{ext}"
+            self._add(path)
+        self.tree_shas = {_sha(f"tree:{self.commit_sha}:{d}"): d for d in self.children}
+        self.root_tree_sha = _sha(f"tree:{self.commit_sha}:")
+
+    def _add(self, path):
+        sha = git_blob_sha(self.content(path).encode("utf-8"))
+        self.files[path] = sha
+        parent, _, name = path.rpartition("/")
+        self.children.setdefault(parent, {})[name] = ("blob", sha)
+        while parent:
+            grand, _, dname = parent.rpartition("/")
+            siblings = self.children.setdefault(grand, {})
+            if dname in siblings:
+                break
+            siblings[dname] = ("tree", None)
+            parent = grand
+
+    def content(self, path):
+        if path.endswith(".py"):
+            body = "".join(f"def func_{i}(x):\n    \"\"\"Step {i}.\"\"\"\n    return x * {i} + len('{path}')\n\n"
+                           for i in range(self.file_lines // 4))
+            return f'"""Synthetic module {path}."""\nimport os\n\n{body}'
+        if path.endswith(".ipynb"):
+            cells = []
+            for i in range(self.notebook_cells):
+                # Mix of one-liners (imports, df.head()) and larger cells
+                source = (f"import module_{i}\n" if i % 3 == 0 else
+                          "".join(f"value_{i}_{j} = compute({j}, '{path}')\n" for j in range(i % 12 + 2)))
+                cells.append({"cell_type": "code", "execution_count": None, "metadata": {},
+                              "outputs": [], "source": source})
+            return json.dumps({"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 5})
+        return f"# {path}\n\nSynthetic document.\n"
+
+    def tree_entry(self, path, type_, sha):
+        if type_ == "tree":
+            return {"path": path, "mode": "040000", "type": "tree",
+                    "sha": _sha(f"tree:{self.commit_sha}:{path}")}
+        return {"path": path, "mode": "100644", "type": "blob", "sha": sha}
+
+    def recursive_tree(self, truncate_at):
+        entries = []
+        stack = [""]
+        while stack:
+            directory = stack.pop()
+            for name, (type_, sha) in sorted(self.children.get(directory, {}).items()):
+                path = f"{directory}/{name}" if directory else name
+                entries.append(self.tree_entry(path, type_, sha))
+                if type_ == "tree":
+                    stack.append(path)
+        truncated = len(entries) > truncate_at
+        return {"sha": self.root_tree_sha, "tree": entries[:truncate_at], "truncated": truncated}
+
+    def level_tree(self, tree_sha):
+        directory = self.tree_shas.get(tree_sha)
+        if directory is None:
+            return None
+        entries = []
+        for name, (type_, sha) in sorted(self.children[directory].items()):
+            # Non-recursive listings use bare names, but subtree SHAs depend on the full path
+            entry = self.tree_entry(f"{directory}/{name}" if directory else name, type_, sha)
+            entries.append(dict(entry, path=name))
+        return {"sha": tree_sha, "tree": entries, "truncated": False}
+
+    def tarball(self):
+        buffer = io.BytesIO()
+        prefix = f"{self.owner}-{self.name}-{self.commit_sha[:7]}"
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            for path in self.files:
+                if not path.endswith((".py", ".ipynb")):
+                    continue
+                data = self.content(path).encode("utf-8")
+                info = tarfile.TarInfo(f"{prefix}/{path}")
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+        return buffer.getvalue()
+
+    def summary(self):
+        return {"full_name": f"{self.owner}/{self.name}", "stargazers_count": len(self.files),
+                "description": "Synthetic benchmark repository", "language": "Python"}
+
+
+class FakeGitHub:
+    """Threaded HTTP server exposing the GitHub endpoints the explorer uses."""
+
+    def __init__(self, repos, latency=0.0, truncate_at=100_000):
+        self.repos = {f"{r.owner}/{r.name}": r for r in repos}
+        self.latency = latency
+        self.truncate_at = truncate_at
+        self.requests = Counter()
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def url_rewrites(self):
+        return {"https://api.github.com": f"{self.base_url}/api",
+                "https://raw.githubusercontent.com": f"{self.base_url}/raw"}
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake._handle(self)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests.clear()
+            self.bytes_sent = 0
+
+    def stats(self):
+        with self._lock:
+            return {"requests": dict(self.requests), "total_requests": sum(self.requests.values()),
+                    "bytes_sent": self.bytes_sent}
+
+    # Routing
+
+    def _route(self, path, query):
+        match = re.fullmatch(r"/raw/([^/]+)/([^/]+)/([^/]+)/(.+)", path)
+        if match:
+            repo = self.repos.get(f"{match[1]}/{match[2]}")
+            if repo is None or match[4] not in repo.files:
+                return "raw", 404, b"404: Not Found", "text/plain"
+            return "raw", 200, repo.content(match[4]).encode("utf-8"), "text/plain; charset=utf-8"
+
+        if path == "/api/search/repositories":
+            per_page = int(query.get("per_page", ["30"])[0])
+            page = int(query.get("page", ["1"])[0])
+            items = [r.summary() for r in self.repos.values()] * 50
+            body = {"total_count": len(items), "items": items[(page - 1) * per_page:page * per_page]}
+            return "search", 200, body, None
+        match = re.fullmatch(r"/api/users/([^/]+)/repos", path)
+        if match:
+            return "user_repos", 200, [r.summary() for r in self.repos.values()
+                                       if r.owner == match[1]], None
+
+        match = re.fullmatch(r"/api/repos/([^/]+)/([^/]+)(/.*)?", path)
+        repo = self.repos.get(f"{match[1]}/{match[2]}") if match else None
+        if repo is None:
+            return "unknown", 404, {"message": "Not Found"}, None
+        rest = match[3] or ""
+        if rest == "":
+            return "repo", 200, {"full_name": f"{repo.owner}/{repo.name}",
+                                 "default_branch": repo.branch}, None
+        if rest == f"/git/ref/heads/{repo.branch}":
+            return "ref", 200, {"object": {"sha": repo.commit_sha, "type": "commit"}}, None
+        if rest.startswith("/tarball/"):
+            return "tarball", 200, repo.tarball(), "application/x-gzip"
+        match = re.fullmatch(r"/git/trees/([^/]+)", rest)
+        if match:
+            ref = match[1]
+            if ref in (repo.commit_sha, repo.branch) and "recursive" in query:
+                return "tree", 200, repo.recursive_tree(self.truncate_at), None
+            level = repo.level_tree(repo.root_tree_sha if ref in (repo.commit_sha, repo.branch) else ref)
+            if level is not None:
+                return "tree_level", 200, level, None
+        return "unknown", 404, {"message": "Not Found"}, None
+
+    def _handle(self, handler):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(handler.path)
+        kind, status, body, content_type = self._route(url.path, parse_qs(url.query))
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        not_modified = status == 200 and handler.headers.get("If-None-Match") == etag
+        with self._lock:
+            self.requests[kind] += 1
+            self.bytes_sent += 0 if not_modified else len(body)
+            remaining = RATE_LIMIT - sum(self.requests.values())
+        handler.send_response(304 if not_modified else status)
+        handler.send_header("ETag", etag)
+        handler.send_header("X-RateLimit-Limit", str(RATE_LIMIT))
+        handler.send_header("X-RateLimit-Remaining", str(max(remaining, RATE_LIMIT // 2)))
+        handler.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+        handler.send_header("X-RateLimit-Resource", "search" if kind == "search" else "core")
+        if not_modified:
+            handler.send_header("Content-Length", "0")
+            handler.end_headers()
+            return
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
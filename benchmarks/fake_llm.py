@@ -0,0 +1,132 @@
+"""Deterministic stand-in for ChatGroq.
+
+Implements the subset of the LangChain chat model interface used by the
+explorer and the orchestrator (invoke/stream, their async variants and
+with_structured_output). Responses depend only on the prompt, and timing is
+simulated as a fixed first-token latency plus a constant token rate.
+"""
+import asyncio
+import hashlib
+import re
+import threading
+import time
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+def _prompt_text(prompt):
+    if isinstance(prompt, str):
+        return prompt
+    return "\n".join(getattr(message, "content", str(message)) for message in prompt)
+
+
+class FakeChatModel:
+    """Chat model with configurable latency and output token rate.
+
+    The answer is roughly as long as the prompt (capped at `max_tokens`
+    tokens of ~4 characters), so annotating bigger code costs more simulated
+    generation time. Packed notebook cells get one answer per delimiter.
+    """
+
+    def __init__(self, latency=0.05, tokens_per_second=500.0, max_tokens=1024,
+                 chunk_tokens=8, sections=5):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.max_tokens = max_tokens
+        self.chunk_tokens = chunk_tokens
+        self.sections = sections
+        self.calls = 0
+        self.tokens = 0
+        self._lock = threading.Lock()
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls = 0
+            self.tokens = 0
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "tokens": self.tokens}
+
+    def _answer(self, prompt):
+        text = _prompt_text(prompt)
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:8]
+        count = max(1, min(len(text) // 4, self.max_tokens))
+        with self._lock:
+            self.calls += 1
+            self.tokens += count
+        # Emitted as a comment so annotated code stays valid Python
+        markers = re.findall(r"^[ \t]*(# <<<CELL \d+>>>)[ \t]*$", text, re.MULTILINE)
+        if not markers:
+            return [f"# note {digest}\n"] + [f"w{i} " for i in range(count - 1)]
+        # Packed notebook cells: answer each one after its delimiter, like a compliant model
+        share = max(1, count // len(markers))
+        words = []
+        for marker in markers:
+            words += [f"{marker}\n# note {digest}\n# "] + [f"w{i} " for i in range(share - 1)] + ["\n"]
+        return words
+
+    def _chunks(self, words):
+        for start in range(0, len(words), self.chunk_tokens):
+            yield "".join(words[start:start + self.chunk_tokens])
+
+    def _delay(self, tokens):
+        return tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    # Sync API
+
+    def invoke(self, prompt, config=None, **kwargs):
+        words = self._answer(prompt)
+        time.sleep(self.latency + self._delay(len(words)))
+        return FakeMessage("".join(words))
+
+    def stream(self, prompt, config=None, **kwargs):
+        words = self._answer(prompt)
+        time.sleep(self.latency)
+        for chunk in self._chunks(words):
+            time.sleep(self._delay(self.chunk_tokens))
+            yield FakeMessage(chunk)
+
+    # Async API
+
+    async def ainvoke(self, prompt, config=None, **kwargs):
+        words = self._answer(prompt)
+        await asyncio.sleep(self.latency + self._delay(len(words)))
+        return FakeMessage("".join(words))
+
+    async def astream(self, prompt, config=None, **kwargs):
+        words = self._answer(prompt)
+        await asyncio.sleep(self.latency)
+        for chunk in self._chunks(words):
+            await asyncio.sleep(self._delay(self.chunk_tokens))
+            yield FakeMessage(chunk)
+
+    def with_structured_output(self, schema, **kwargs):
+        return FakeStructuredModel(self, schema)
+
+
+class FakeStructuredModel:
+    """Structured output for the orchestrator planner: `sections` report sections."""
+
+    def __init__(self, model, schema):
+        self.model = model
+        self.schema = schema
+
+    def _plan(self, prompt):
+        digest = hashlib.sha1(_prompt_text(prompt).encode("utf-8")).hexdigest()[:6]
+        return self.schema(sections=[
+            {"name": f"Section {i} {digest}", "description": f"Synthetic topic {i} of the report"}
+            for i in range(self.model.sections)])
+
+    def invoke(self, prompt, config=None, **kwargs):
+        self.model._answer(prompt)
+        time.sleep(self.model.latency)
+        return self._plan(prompt)
+
+    async def ainvoke(self, prompt, config=None, **kwargs):
+        self.model._answer(prompt)
+        await asyncio.sleep(self.model.latency)
+        return self._plan(prompt)
@@ -0,0 +1,318 @@
+"""Offline end-to-end benchmarks for the explorer and the orchestrator.
+
+Runs `get_files_structure`, `analyze_file`, `annotate_code`,
+`convert_notebook_to_html` and the orchestrator graph against a local fake
+GitHub server and a fake chat model, and reports p50/p95 latency,
+throughput, HTTP requests, LLM calls and peak Python memory per scenario.
+
+    python benchmarks/run_benchmarks.py                    # all scenarios
+    python benchmarks/run_benchmarks.py -k tree --entries 1000 100000
+    python benchmarks/run_benchmarks.py --save-baseline    # store baselines.json
+    python benchmarks/run_benchmarks.py --compare          # fail on regressions
+
+Baselines are machine-dependent: generate them with --save-baseline on the
+machine that will run --compare.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+import uuid
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+BASELINE_PATH = os.path.join(HERE, "baselines.json")
+
+sys.path.insert(0, HERE)
+from fake_github import FakeGitHub, SyntheticRepo  # noqa: E402
+from fake_llm import FakeChatModel  # noqa: E402
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Bench:
+    """Runs the scenarios and collects their metrics."""
+
+    def __init__(self, server, llm, iterations, memory=True, verbose=False):
+        self.server = server
+        self.llm = llm
+        self.iterations = iterations
+        self.memory = memory
+        self.verbose = verbose
+        self.results = {}
+
+    def quiet(self):
+        """Silence the explorer's debug output while a scenario runs."""
+        if self.verbose:
+            return contextlib.nullcontext()
+        return contextlib.redirect_stdout(io.StringIO())
+
+    def measure(self, name, run, setup=None, iterations=None):
+        iterations = iterations or self.iterations
+        timings = []
+        self.server.reset_stats()
+        self.llm.reset_stats()
+        with self.quiet():
+            for _ in range(iterations):
+                if setup:
+                    setup()
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+            http, llm = self.server.stats(), self.llm.stats()
+            peak = None
+            if self.memory:
+                # Separate pass: tracemalloc slows down the timed iterations
+                if setup:
+                    setup()
+                tracemalloc.start()
+                run()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        self.record(name, timings, http, llm, peak)
+
+    def record(self, name, timings, http, llm, peak):
+        count = len(timings)
+        result = {
+            "iterations": count,
+            "p50_ms": percentile(timings, 50) * 1000,
+            "p95_ms": percentile(timings, 95) * 1000,
+            "mean_ms": statistics.fmean(timings) * 1000,
+            "throughput_per_s": count / sum(timings) if sum(timings) else None,
+            "http_requests": http["total_requests"] / count,
+            "http_bytes": http["bytes_sent"] / count,
+            "http_by_route": {route: n / count for route, n in sorted(http["requests"].items())},
+            "llm_calls": llm["calls"] / count,
+            "llm_tokens": llm["tokens"] / count,
+            "peak_memory_mb": peak / 2 ** 20 if peak is not None else None,
+        }
+        self.results[name] = result
+        peak_text = f"{result['peak_memory_mb']:8.1f}MB" if peak is not None else "       -"
+        print(f"{name:<32} p50 {result['p50_ms']:9.1f}ms  p95 {result['p95_ms']:9.1f}ms  "
+              f"{result['throughput_per_s'] or 0:8.2f}/s  http {result['http_requests']:7.1f}  "
+              f"llm {result['llm_calls']:6.1f}  peak {peak_text}")
+
+
+def configure_environment(workdir):
+    """Keep caches and stores inside `workdir` and lift the real LLM rate limits."""
+    os.environ.update({
+        "GITHUB_CACHE_PATH": os.path.join(workdir, "github_cache.sqlite"),
+        "ANNOTATION_CACHE": "memory",
+        "ANNOTATION_CACHE_PATH": os.path.join(workdir, "annotations.sqlite"),
+        "REPO_STORE_PATH": os.path.join(workdir, "repo_store"),
+        "REPO_INGEST": "off",
+        "SYMBOL_INDEX_PATH": os.path.join(workdir, "symbols.sqlite"),
+        "GROQ_API_KEY": os.environ.get("GROQ_API_KEY") or "benchmark",
+        "GROQ_RPM": "1000000",
+        "GROQ_TPM": "1000000000",
+    })
+    os.environ.pop("GITHUB_TOKEN", None)
+
+
+def load_explorer(server, llm, verbose=False):
+    sys.path.insert(0, os.path.join(ROOT, "github_explorer"))
+    from explorer_core import explorer
+    from explorer_core.github_cache import GitHubCache
+    from explorer_core.github_client import GitHubClient, set_client
+    from explorer_core.telemetry import configure_logging
+
+    configure_logging("DEBUG" if verbose else "WARNING")
+    explorer.set_llm(llm)
+    set_client(GitHubClient(cache=GitHubCache(os.environ["GITHUB_CACHE_PATH"]),
+                            url_rewrites=server.url_rewrites))
+    return explorer
+
+
+def load_orchestrator(llm, workdir):
+    """Run the notebook definition cell with `llm` in place of ChatGroq."""
+    orchestrator_dir = os.path.join(ROOT, "orchestator")
+    sys.path.insert(0, orchestrator_dir)
+    with open(os.path.join(orchestrator_dir, "orchest_to_share.ipynb"), encoding="utf-8") as f:
+        notebook = json.load(f)
+    source = "".join(notebook["cells"][0]["source"])
+    fake_groq = types.ModuleType("langchain_groq")
+    fake_groq.ChatGroq = lambda **kwargs: llm
+    real_groq = sys.modules.get("langchain_groq")
+    sys.modules["langchain_groq"] = fake_groq
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        namespace = {"__name__": "orchestrator_benchmark"}
+        exec(compile(source, "orchest_to_share.ipynb[0]", "exec"), namespace)
+    finally:
+        os.chdir(cwd)
+        if real_groq is not None:
+            sys.modules["langchain_groq"] = real_groq
+        else:
+            sys.modules.pop("langchain_groq", None)
+    return namespace
+
+
+def tree_scenarios(bench, explorer, repos):
+    from explorer_core.tree_index import TreeIndexCache
+
+    client = explorer.get_client()
+
+    def cold():
+        client.cache.clear()
+        explorer.tree_indexes = TreeIndexCache()
+
+    for repo in repos:
+        full_name = f"{repo.owner}/{repo.name}"
+        name = f"files_structure[{len(repo.files)}]"
+        bench.measure(f"{name}.cold", lambda: explorer.get_files_structure(full_name), setup=cold)
+        explorer.get_files_structure(full_name)
+        bench.measure(f"{name}.warm", lambda: explorer.get_files_structure(full_name))
+
+
+def annotation_scenarios(bench, explorer, repo):
+    py_path = next(p for p in repo.files if p.endswith(".py"))
+    nb_path = next(p for p in repo.files if p.endswith(".ipynb"))
+    base = f"https://github.com/{repo.owner}/{repo.name}/blob/{repo.branch}/"
+    full_name = f"{repo.owner}/{repo.name}"
+    notebook = repo.content(nb_path)
+
+    def cold():
+        explorer.annotation_cache.clear()
+
+    for label, path in (("py", py_path), ("notebook", nb_path)):
+        run = lambda path=path: explorer.analyze_file(full_name, base + path)
+        bench.measure(f"analyze_file[{label}].cold", run, setup=cold)
+        bench.measure(f"analyze_file[{label}].warm", run)
+    bench.measure("annotate_code[notebook].cold",
+                  lambda: explorer.annotate_code(notebook, is_notebook=True), setup=cold)
+    renderer = explorer.get_renderer()
+    bench.measure("convert_notebook_to_html.cold",
+                  lambda: explorer.convert_notebook_to_html(notebook), setup=renderer.clear)
+    bench.measure("convert_notebook_to_html.warm",
+                  lambda: explorer.convert_notebook_to_html(notebook))
+
+
+def orchestrator_scenarios(bench, namespace):
+    graph = namespace["orchestrator_worker"]
+    cache = namespace["section_cache"]
+    inputs = {"topic": "Benchmark report", "sections": [], "completed_sections": {},
+              "final_report": "", "feedback": ""}
+
+    def thread():
+        return {"configurable": {"thread_id": f"bench-{uuid.uuid4().hex}"}}
+
+    bench.measure("orchestrator.invoke.cold", lambda: graph.invoke(inputs, thread()), setup=cache.clear)
+    bench.measure("orchestrator.invoke.warm", lambda: graph.invoke(inputs, thread()))
+
+    async def run_async():
+        async for _event in namespace["stream_report"](inputs, thread()):
+            pass
+
+    # A fresh event loop per iteration, as separate asyncio.run() callers would do
+    timings = []
+    bench.server.reset_stats()
+    bench.llm.reset_stats()
+    with bench.quiet():
+        for _ in range(bench.iterations):
+            cache.clear()
+            start = time.perf_counter()
+            asyncio.run(run_async())
+            timings.append(time.perf_counter() - start)
+    bench.record("orchestrator.stream_report.cold", timings, bench.server.stats(),
+                 bench.llm.stats(), None)
+
+
+def compare(results, baseline, tolerance):
+    """Compare p50 and request counts against the baseline; return the regressions."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<32} (no baseline)")
+            continue
+        ratio = result["p50_ms"] / base["p50_ms"] if base["p50_ms"] else 1.0
+        flags = []
+        if ratio > 1 + tolerance:
+            flags.append(f"p50 +{(ratio - 1) * 100:.0f}%")
+        if result["http_requests"] > base["http_requests"]:
+            flags.append(f"http {base['http_requests']:.1f} -> {result['http_requests']:.1f}")
+        if result["llm_calls"] > base["llm_calls"]:
+            flags.append(f"llm {base['llm_calls']:.1f} -> {result['llm_calls']:.1f}")
+        print(f"{name:<32} p50 x{ratio:5.2f}  {'REGRESSION: ' + ', '.join(flags) if flags else 'ok'}")
+        if flags:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", "--scenarios", nargs="*", default=["tree", "annotate", "orchestrator"],
+                        choices=["tree", "annotate", "orchestrator"])
+    parser.add_argument("--entries", nargs="*", type=int, default=[1000, 10000, 100000],
+                        help="Tree entries of each synthetic repository")
+    parser.add_argument("-n", "--iterations", type=int, default=5)
+    parser.add_argument("--notebook-cells", type=int, default=40)
+    parser.add_argument("--file-lines", type=int, default=400)
+    parser.add_argument("--http-latency", type=float, default=0.0, help="Seconds per fake HTTP request")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds to the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=500.0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory pass")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show the explorer's debug log")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p50 slowdown")
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="explorer-bench-")
+    configure_environment(workdir)
+    repos = [SyntheticRepo(name=f"repo{n}", entries=n, file_lines=args.file_lines,
+                           notebook_cells=args.notebook_cells) for n in args.entries]
+    server = FakeGitHub(repos, latency=args.http_latency).start()
+    llm = FakeChatModel(latency=args.llm_latency, tokens_per_second=args.tokens_per_second)
+    bench = Bench(server, llm, args.iterations, memory=not args.no_memory, verbose=args.verbose)
+    try:
+        if "tree" in args.scenarios or "annotate" in args.scenarios:
+            explorer = load_explorer(server, llm, args.verbose)
+            if "tree" in args.scenarios:
+                tree_scenarios(bench, explorer, repos)
+            if "annotate" in args.scenarios:
+                annotation_scenarios(bench, explorer, repos[0])
+        if "orchestrator" in args.scenarios:
+            orchestrator_scenarios(bench, load_orchestrator(llm, workdir))
+    finally:
+        server.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(bench.results, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(bench.results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first")
+            return 2
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(bench.results, json.load(f), args.tolerance)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
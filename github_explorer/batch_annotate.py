@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+# Antes de importar el núcleo: su configuración se lee del entorno al importarse
+load_dotenv()
+
+from explorer_core.explorer import (annotate_code, build_filtered_tree, fetch_file,
+                                    fetch_repo_structure, get_branch_sha,
+                                    get_default_branch, ingest_repository)
+from explorer_core.llm_limiter import estimate_tokens
+from explorer_core.telemetry import configure_logging, dump_metrics, log, start_exporters
+
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "4"))
+PROGRESS_FILE = ".progress.jsonl"
+
+
+def iter_tree_files(tree):
+    """Recorre el árbol de `build_filtered_tree` y devuelve sus archivos."""
+    for key, value in sorted(tree.items()):
+        if isinstance(value, dict) and "url" not in value:
+            yield from iter_tree_files(value)
+        else:
+            yield value
+
+
+def load_progress(output_dir):
+    """Lee el registro de progreso: ruta -> sha del blob ya anotado."""
+    done = {}
+    path = os.path.join(output_dir, PROGRESS_FILE)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Última línea a medio escribir de una ejecución interrumpida
+                    continue
+                done[entry["path"]] = entry.get("sha")
+    return done
+
+
+class BatchStats:
+    """Contadores de rendimiento del trabajo por lotes."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.files = 0
+        self.skipped = 0
+        self.failed = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self._lock = threading.Lock()
+
+    def add(self, tokens_in, tokens_out):
+        with self._lock:
+            self.files += 1
+            self.tokens_in += tokens_in
+            self.tokens_out += tokens_out
+
+    def summary(self):
+        minutes = max(time.monotonic() - self.started, 1e-6) / 60
+        return {
+            "files": self.files,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "files_per_min": round(self.files / minutes, 2),
+            "tokens_per_min": round((self.tokens_in + self.tokens_out) / minutes, 1),
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+            "elapsed_s": round(minutes * 60, 1),
+        }
+
+
+def annotate_repository(repo_full_name, output_dir, max_workers=BATCH_MAX_WORKERS,
+                        archive=False, ingest=True):
+    """Anota todos los .py y .ipynb de un repositorio y los guarda en `output_dir`.
+
+    El progreso se registra archivo a archivo, de modo que una ejecución
+    interrumpida se reanuda sin repetir los archivos ya anotados (mientras
+    su blob no haya cambiado). Con `ingest` el repo se descarga una sola vez
+    como tarball en lugar de archivo a archivo. Devuelve las estadísticas.
+    """
+    owner, repo = repo_full_name.split(" (")[0].split("/")
+    branch = get_default_branch(owner, repo)
+    if not branch:
+        raise RuntimeError(f"Could not fetch default branch for {owner}/{repo}")
+    if ingest:
+        commit_sha = get_branch_sha(owner, repo, branch)
+        if commit_sha and ingest_repository(owner, repo, commit_sha) is None:
+            log.warning("annotate_repository - Archive ingestion failed, falling back to per-file fetches")
+    repo_data = fetch_repo_structure(owner, repo, branch)
+    if not repo_data or "tree" not in repo_data:
+        raise RuntimeError(f"Could not fetch repository structure for {owner}/{repo}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    files = list(iter_tree_files(build_filtered_tree(repo_data["tree"], owner, repo, branch)))
+    done = load_progress(output_dir)
+    stats = BatchStats()
+    pending = []
+    for node in files:
+        if node["path"] in done and done[node["path"]] == node.get("sha"):
+            stats.skipped += 1
+        else:
+            pending.append(node)
+    log.info("annotate_repository - %s/%s@%s: %d files, %d pending",
+             owner, repo, branch, len(files), len(pending))
+
+    progress_lock = threading.Lock()
+    progress = open(os.path.join(output_dir, PROGRESS_FILE), "a", encoding="utf-8")
+
+    def process(node):
+        content = fetch_file(node["url"])
+        if content is None:
+            raise RuntimeError("could not fetch file content")
+        # Estricto: un archivo con alguna celda o fragmento fallido no se da por hecho
+        result = annotate_code(content, is_notebook=node["type"] == "notebook", strict=True)
+        target = os.path.join(output_dir, node["path"])
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w", encoding="utf-8") as f:
+            f.write(result)
+        stats.add(estimate_tokens(content), estimate_tokens(result))
+        with progress_lock:
+            progress.write(json.dumps({"path": node["path"], "sha": node.get("sha")}) + "\n")
+            progress.flush()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="batch") as pool:
+            futures = {pool.submit(process, node): node for node in pending}
+            for future in as_completed(futures):
+                node = futures[future]
+                try:
+                    future.result()
+                    log.info("annotate_repository - Done %s (%d/%d)",
+                             node["path"], stats.files, len(pending))
+                except Exception as e:
+                    stats.failed += 1
+                    log.warning("annotate_repository - Failed %s: %s", node["path"], e)
+    finally:
+        progress.close()
+
+    if archive:
+        shutil.make_archive(output_dir.rstrip("/\\"), "zip", output_dir)
+    summary = stats.summary()
+    log.info("annotate_repository - %s", json.dumps(summary))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Annotate every .py and .ipynb file of a GitHub repository.")
+    parser.add_argument("repo", help="Repository as owner/name")
+    parser.add_argument("-o", "--output", help="Output directory (default: ./annotated/<owner>_<repo>)")
+    parser.add_argument("-w", "--workers", type=int, default=BATCH_MAX_WORKERS,
+                        help="Files annotated concurrently")
+    parser.add_argument("--archive", action="store_true", help="Also write a .zip of the output")
+    parser.add_argument("--no-ingest", action="store_true",
+                        help="Fetch files one by one instead of downloading the repo tarball")
+    parser.add_argument("--metrics", help="Write Prometheus-text metrics to this file at the end")
+    args = parser.parse_args(argv)
+    # En la línea de comandos el progreso se muestra salvo que se pida otro nivel
+    configure_logging(os.getenv("EXPLORER_LOG_LEVEL", "INFO"))
+    start_exporters()
+    output = args.output or os.path.join("annotated", args.repo.replace("/", "_"))
+    summary = annotate_repository(args.repo, output, max_workers=args.workers,
+                                  archive=args.archive, ingest=not args.no_ingest)
+    print(json.dumps(summary))
+    if args.metrics:
+        dump_metrics(args.metrics)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
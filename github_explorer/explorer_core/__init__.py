@@ -0,0 +1,8 @@
+"""Núcleo sin interfaz del explorador: cliente de GitHub, índice de árboles,
+anotación con el LLM y renderizado de notebooks.
+
+Las dependencias pesadas (langchain_groq, nbformat, nbconvert) se importan
+solo al usarse, de modo que los workers y las tareas de línea de comandos
+arrancan sin cargar la interfaz web. La interfaz de Gradio (`git_gradio`)
+es una capa fina sobre `explorer_core.explorer`.
+"""
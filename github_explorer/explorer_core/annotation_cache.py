@@ -0,0 +1,158 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "ANNOTATION_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "github_explorer", "annotations.sqlite"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("ANNOTATION_CACHE_MAX_ENTRIES", "2048"))
+
+
+def template_hash(template):
+    """Hash estable de una plantilla de prompt."""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+def annotation_key(source, template, model):
+    """Clave direccionada por contenido: hash(código, plantilla, modelo)."""
+    digest = hashlib.sha256()
+    for part in (model, template_hash(template), source):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class MemoryBackend:
+    """Backend LRU en memoria, acotado por número de entradas."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            self._data.move_to_end(key)
+            return item[0]
+
+    def set(self, key, value, tmpl_hash):
+        with self._lock:
+            self._data[key] = (value, tmpl_hash)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def purge(self, keep_hashes):
+        with self._lock:
+            stale = [k for k, (_, h) in self._data.items() if h not in keep_hashes]
+            for key in stale:
+                del self._data[key]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DiskBackend:
+    """Backend persistente en SQLite con expulsión LRU por número de entradas."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES * 16):
+        self.max_entries = max_entries
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS annotations ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " template_hash TEXT NOT NULL, accessed_at REAL NOT NULL)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM annotations WHERE key = ?",
+                                     (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE annotations SET accessed_at = ? WHERE key = ?",
+                               (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def set(self, key, value, tmpl_hash):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO annotations VALUES (?, ?, ?, ?)",
+                (key, value, tmpl_hash, time.time()))
+            self._conn.execute(
+                "DELETE FROM annotations WHERE key IN (SELECT key FROM annotations"
+                " ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+            self._conn.commit()
+
+    def purge(self, keep_hashes):
+        with self._lock:
+            marks = ",".join("?" * len(keep_hashes)) or "''"
+            cursor = self._conn.execute(
+                f"DELETE FROM annotations WHERE template_hash NOT IN ({marks})",
+                tuple(keep_hashes))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM annotations")
+            self._conn.commit()
+
+
+class AnnotationCache:
+    """Caché de anotaciones del LLM sobre un backend intercambiable.
+
+    Como la plantilla forma parte de la clave, cambiar un prompt invalida
+    automáticamente sus anotaciones; `purge_templates` libera las entradas
+    de plantillas que ya no están en uso.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, source, template, model):
+        value = self.backend.get(annotation_key(source, template, model))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, source, template, model, value):
+        self.backend.set(annotation_key(source, template, model), value,
+                         template_hash(template))
+
+    def purge_templates(self, current_templates):
+        """Elimina las anotaciones generadas con plantillas distintas a las actuales."""
+        return self.backend.purge({template_hash(t) for t in current_templates})
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def create_annotation_cache(kind=None):
+    """Crea la caché según `ANNOTATION_CACHE` (memory, disk u off)."""
+    kind = kind or os.getenv("ANNOTATION_CACHE", "disk")
+    if kind == "off":
+        return None
+    if kind == "memory":
+        return AnnotationCache(MemoryBackend())
+    return AnnotationCache(DiskBackend())
@@ -0,0 +1,84 @@
+import os
+import re
+
+from .llm_limiter import estimate_tokens
+
+# Presupuesto de tokens de código de una petición con varias celdas
+PACK_TOKENS = int(os.getenv("NOTEBOOK_PACK_TOKENS", "800"))
+# Solo se empaquetan las celdas de como mucho este tamaño
+SMALL_CELL_TOKENS = int(os.getenv("NOTEBOOK_SMALL_CELL_TOKENS", "150"))
+
+_MARKER = "# <<<CELL {}>>>"
+_MARKER_RE = re.compile(r"^[ \t]*# <<<CELL (\d+)>>>[ \t]*$", re.MULTILINE)
+# Coste aproximado de cada delimitador en tokens
+_MARKER_TOKENS = estimate_tokens(_MARKER.format(0)) + 1
+
+
+def pack_cells(sources, max_tokens=PACK_TOKENS, small_tokens=SMALL_CELL_TOKENS):
+    """Agrupa celdas pequeñas consecutivas en lotes de como mucho `max_tokens`.
+
+    Devuelve listas de índices en el orden original; las celdas grandes
+    quedan solas en su propio lote.
+    """
+    groups, current, size = [], [], 0
+    for index, source in enumerate(sources):
+        tokens = estimate_tokens(source) + _MARKER_TOKENS
+        if tokens - _MARKER_TOKENS > small_tokens:
+            if current:
+                groups.append(current)
+                current, size = [], 0
+            groups.append([index])
+            continue
+        if current and size + tokens > max_tokens:
+            groups.append(current)
+            current, size = [], 0
+        current.append(index)
+        size += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def join_cells(sources):
+    """Une las celdas con un delimitador numerado antes de cada una."""
+    return "\n".join(f"{_MARKER.format(i)}\n{source.rstrip()}" for i, source in enumerate(sources))
+
+
+# Primer bloque ```...``` de una respuesta, con su etiqueta de lenguaje opcional
+_FENCED_RE = re.compile(r"^[ \t]*```[\w+-]*[ \t]*\n(.*?)^[ \t]*```[ \t]*$", re.MULTILINE | re.DOTALL)
+
+
+def strip_fences(text):
+    """Código de una respuesta del LLM sin vallas markdown ni texto alrededor.
+
+    Si hay un bloque ``` completo se devuelve solo su contenido; si no, se
+    quitan las vallas sueltas del principio y del final.
+    """
+    match = _FENCED_RE.search(text)
+    if match:
+        return match.group(1).strip("\n")
+    lines = text.strip("\n").split("\n")
+    while lines and lines[0].strip().startswith("```"):
+        lines.pop(0)
+    while lines and lines[-1].strip().startswith("```"):
+        lines.pop()
+    return "\n".join(lines).strip("\n")
+
+
+def split_cells(response, count):
+    """Separa la respuesta del LLM en `count` celdas, o None si no cuadra.
+
+    Exige que aparezcan exactamente los delimitadores 0..count-1, en orden,
+    y que ninguna celda quede vacía.
+    """
+    matches = list(_MARKER_RE.finditer(response))
+    if [int(m.group(1)) for m in matches] != list(range(count)):
+        return None
+    cells = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(response)
+        cell = strip_fences(response[match.end():end])
+        if not cell.strip():
+            return None
+        cells.append(cell)
+    return cells
@@ -0,0 +1,73 @@
+import ast
+import os
+
+from .llm_limiter import estimate_tokens
+
+# Presupuesto de tokens de código por petición al LLM
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "1500"))
+
+
+def _top_level_starts(source):
+    """Líneas (base 0) donde empieza cada sentencia de nivel superior."""
+    tree = ast.parse(source)
+    starts = []
+    for node in tree.body:
+        # Los decoradores pertenecen a la función o clase que decoran
+        decorators = getattr(node, "decorator_list", [])
+        starts.append(min([node.lineno] + [d.lineno for d in decorators]) - 1)
+    return starts
+
+
+def _line_windows(lines, max_tokens):
+    """Agrupa líneas consecutivas en ventanas que no superan `max_tokens`."""
+    windows, current, size = [], [], 0
+    for line in lines:
+        tokens = estimate_tokens(line)
+        if current and size + tokens > max_tokens:
+            windows.append(current)
+            current, size = [], 0
+        current.append(line)
+        size += tokens
+    if current:
+        windows.append(current)
+    return windows
+
+
+def chunk_source(source, max_tokens=CHUNK_TOKENS):
+    """Divide código Python en fragmentos de como mucho `max_tokens` tokens.
+
+    Los cortes se hacen en los límites de funciones y clases de nivel superior
+    (vía `ast`); los bloques que no caben solos, o los ficheros que no se
+    pueden parsear, se trocean por ventanas de líneas. Concatenar los
+    fragmentos devuelve exactamente el código original.
+    """
+    lines = source.splitlines(keepends=True)
+    if estimate_tokens(source) <= max_tokens:
+        return [source]
+    try:
+        starts = _top_level_starts(source)
+    except (SyntaxError, ValueError):
+        return ["".join(w) for w in _line_windows(lines, max_tokens)]
+
+    # Segmentos: desde el inicio de una sentencia hasta el de la siguiente,
+    # de modo que comentarios y líneas en blanco viajan con el bloque anterior
+    bounds = sorted(set([0] + starts[1:])) + [len(lines)]
+    segments = [lines[a:b] for a, b in zip(bounds, bounds[1:]) if b > a]
+
+    chunks, current, size = [], [], 0
+    for segment in segments:
+        tokens = estimate_tokens("".join(segment))
+        if tokens > max_tokens:
+            if current:
+                chunks.append(current)
+                current, size = [], 0
+            chunks.extend(_line_windows(segment, max_tokens))
+            continue
+        if current and size + tokens > max_tokens:
+            chunks.append(current)
+            current, size = [], 0
+        current.extend(segment)
+        size += tokens
+    if current:
+        chunks.append(current)
+    return ["".join(chunk) for chunk in chunks]
@@ -0,0 +1,848 @@
+import html
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .annotation_cache import create_annotation_cache
+from .cell_packing import join_cells, pack_cells, split_cells, strip_fences
+from .code_chunker import chunk_source
+from .github_client import BRANCH_TTL, REPO_TTL, SEARCH_TTL, get_client
+from .llm_limiter import RateLimiter, invoke_with_retry, stream_with_retry
+from .notebook_render import get_renderer
+from .repo_archive import get_store
+from .repo_search import SEARCH_PER_PAGE
+from .symbol_index import PathIndex, extract_symbols, get_symbol_store
+from .telemetry import log, metrics, span
+from .tree_index import BlobShaMap, TreeIndex, TreeIndexCache
+
+GROQ_MODEL = "qwen-2.5-32b"
+
+# El cliente del LLM se crea en el primer uso: importar langchain_groq es lento
+# y ChatGroq falla sin GROQ_API_KEY, lo que no debe impedir usar el resto
+_llm = None
+_llm_lock = threading.Lock()
+
+def get_llm():
+    """Devuelve el cliente del LLM compartido, creándolo la primera vez."""
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                from langchain_groq import ChatGroq
+                _llm = ChatGroq(model=GROQ_MODEL)
+    return _llm
+
+def set_llm(llm):
+    """Sustituye el cliente del LLM (p. ej. por un modelo falso en los benchmarks)."""
+    global _llm
+    _llm = llm
+
+# Concurrencia de las llamadas al LLM, acotada por los límites del proveedor
+LLM_MAX_WORKERS = int(os.getenv("LLM_MAX_WORKERS", "8"))
+llm_limiter = RateLimiter()
+llm_executor = ThreadPoolExecutor(max_workers=LLM_MAX_WORKERS, thread_name_prefix="llm")
+
+# Plantillas de prompt; `{code}` se sustituye por el código a anotar
+NOTEBOOK_PROMPT = """Analyze this Python code and provide comments between the python code provided do it from a point of view where learning and understanding is the most important thing.
+                     Follow these rules strictly:
+                        1. If an explanation is longer than 200 characters, split it into multiple lines
+                        2. Each comment line MUST NOT exceed 200 characters
+                        3. Use '# Part X:' prefix for split comments (e.g., '# Part 1: First part of explanation')
+                        4. Focus on explaining complex logic and important concepts
+                        5. Use clear and concise language
+                        6. Format multi-line comments like this:
+                        # Part 1: First part of the long explanation...
+                        # Part 2: Continuation of the explanation...
+                        
+                        Code to analyze:
+                        {code}
+                        """
+
+PYTHON_PROMPT = """Analyze this Python code and provide concise comments. Follow these rules strictly:
+            1. Keep each comment under 100 characters
+            2. Use simple, clear language
+            3. Focus on the most important aspects only
+            4. Add comments only for key lines or blocks
+            5. Skip obvious or self-explanatory code
+            6. Return only the annotated code: no text before or after it and no markdown fences
+            
+            Code to analyze:
+            {code}
+            """
+
+# Varias celdas pequeñas en una sola petición; los delimitadores deben volver intactos
+NOTEBOOK_PACKED_PROMPT = """Analyze these Python notebook cells and provide comments between the python code provided do it from a point of view where learning and understanding is the most important thing.
+                     Follow these rules strictly:
+                        1. Each cell starts with a delimiter line like '# <<<CELL 0>>>'
+                        2. Copy every delimiter line unchanged, in the same order, before the annotated code of its cell
+                        3. Never merge, split, drop or reorder cells
+                        4. Each comment line MUST NOT exceed 200 characters
+                        5. Use '# Part X:' prefix for split comments (e.g., '# Part 1: First part of explanation')
+                        6. Focus on explaining complex logic and important concepts
+                        7. Use clear and concise language
+                        
+                        Cells to analyze:
+                        {code}
+                        """
+
+# Caché de anotaciones; se descartan las generadas con plantillas antiguas
+annotation_cache = create_annotation_cache()
+if annotation_cache is not None:
+    annotation_cache.purge_templates([NOTEBOOK_PROMPT, NOTEBOOK_PACKED_PROMPT, PYTHON_PROMPT])
+
+def fetch_search_page(search_type, query, page=1, per_page=SEARCH_PER_PAGE):
+    """Obtiene una página de resultados de búsqueda; devuelve (repos, hay_más).
+
+    Un usuario inexistente (404) no da resultados; cualquier otro error
+    (cuota agotada incluida) se lanza con un mensaje legible.
+    """
+    if search_type == "Username":
+        url = f"https://api.github.com/users/{query}/repos"
+        params = {"sort": "stars", "order": "desc"}
+    else:
+        url = "https://api.github.com/search/repositories"
+        q = f"topic:{query}" if search_type == "Topic" else query
+        params = {"q": q, "sort": "stars", "order": "desc"}
+    params.update(per_page=per_page, page=page)
+    response = get_client().api_get(url, params=params, ttl=SEARCH_TTL)
+    log.debug("fetch_search_page - %s '%s' page %d: %s", search_type, query, page, response.status_code)
+    
+    if response.status_code == 404:
+        return [], False
+    if response.status_code != 200:
+        raise RuntimeError(get_client().rate_limit_message()
+                           or f"GitHub search failed with status {response.status_code}")
+    data = response.json()
+    items = data if search_type == "Username" else data.get("items", [])
+    results = [{"full_name": item["full_name"], 
+               "stars": item["stargazers_count"],
+               "description": item["description"] or "No description",
+               "language": item["language"] or "Not specified"} 
+              for item in items]
+    # Se sigue la cabecera Link; las respuestas cacheadas no la conservan
+    links = getattr(response, "links", None)
+    if links is not None and "next" in links:
+        has_next = True
+    elif search_type == "Username":
+        has_next = len(items) == per_page
+    else:
+        # La API de búsqueda no devuelve más allá de 1000 resultados
+        has_next = page * per_page < min(data.get("total_count", 0), 1000)
+    return results, has_next
+
+def get_default_branch(owner, repo):
+    """Obtiene la rama por defecto del repositorio."""
+    log.debug("get_default_branch - Checking for %s/%s", owner, repo)
+    url = f"https://api.github.com/repos/{owner}/{repo}"
+    response = get_client().api_get(url, ttl=REPO_TTL)
+    log.debug("get_default_branch - Response status: %s", response.status_code)
+    
+    if response.status_code == 200:
+        branch = response.json().get("default_branch")
+        log.debug("get_default_branch - Default branch found: %s", branch)
+        return branch
+    log.warning("get_default_branch - Error response: %s", response.text)
+    return None
+
+def get_branch_sha(owner, repo, branch):
+    """Obtiene el SHA del commit al que apunta la rama."""
+    url = f"https://api.github.com/repos/{owner}/{repo}/git/ref/heads/{branch}"
+    response = get_client().api_get(url, ttl=BRANCH_TTL)
+    log.debug("get_branch_sha - Response status: %s", response.status_code)
+    
+    if response.status_code == 200:
+        return response.json().get("object", {}).get("sha")
+    return None
+
+def fetch_repo_structure(owner, repo, branch=None):
+    """Obtiene la estructura del repositorio."""
+    log.debug("fetch_repo_structure - Fetching structure for %s/%s", owner, repo)
+    branch = branch or get_default_branch(owner, repo)
+    if not branch:
+        log.warning("fetch_repo_structure - Could not get default branch")
+        return None
+    
+    # El árbol de un commit concreto es inmutable: se cachea por su SHA
+    sha = get_branch_sha(owner, repo, branch)
+    if sha and (REPO_INGEST == "archive" or get_store().manifest(owner, repo, sha) is not None):
+        data = ingest_repository(owner, repo, sha)
+        if data:
+            log.debug("fetch_repo_structure - %d files from archive", len(data["tree"]))
+            return data
+    url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{sha or branch}?recursive=1"
+    if sha:
+        response = get_client().api_get(url, immutable=True,
+                                        cache_key=f"tree:{owner}/{repo}:{sha}")
+    else:
+        response = get_client().api_get(url, ttl=BRANCH_TTL)
+    log.debug("fetch_repo_structure - Response status: %s", response.status_code)
+    
+    if response.status_code == 200:
+        data = response.json()
+        log.debug("fetch_repo_structure - Found %d items", len(data.get("tree", [])))
+        return data
+    log.warning("fetch_repo_structure - Error response: %s", response.text)
+    return None
+
+def ingest_repository(owner, repo, commit_sha):
+    """Ingiere el tarball del commit en el almacén local y devuelve su árbol.
+
+    Devuelve None si la ingesta falla por cualquier motivo (tarball corrupto,
+    red, cuota agotada): quien llama recurre a la API archivo a archivo.
+    """
+    try:
+        if get_store().ingest(owner, repo, commit_sha) is None:
+            return None
+        return get_store().tree_data(owner, repo, commit_sha)
+    except Exception as e:
+        log.warning("ingest_repository - Ingestion of %s/%s@%s failed: %s", owner, repo, commit_sha, e)
+        return None
+
+# "archive" descarga el tarball de cada commit una vez en lugar de un raw por archivo
+REPO_INGEST = os.getenv("REPO_INGEST", "off")
+
+# Índices de árbol ya construidos (uno por commit) y tamaño de página por directorio
+tree_indexes = TreeIndexCache()
+DIR_PAGE_SIZE = int(os.getenv("DIR_PAGE_SIZE", "200"))
+
+# SHA del blob de cada archivo listado, para cachear su contenido como inmutable
+_blob_shas = BlobShaMap()
+
+def to_raw_url(file_url):
+    """Convierte una URL de GitHub (blob o raw) en su URL raw."""
+    # Si la URL es normal de GitHub, convertirla a raw
+    if "github.com" in file_url:
+        return (file_url.replace("github.com", "raw.githubusercontent.com")
+                        .replace("/blob/", "/"))
+    # Convertir URL raw a normal y luego a raw de nuevo
+    github_url = (file_url.replace("raw.githubusercontent.com", "github.com")
+                          .replace("/master/", "/blob/master/"))
+    return (github_url.replace("github.com", "raw.githubusercontent.com")
+                      .replace("/blob/", "/"))
+
+def fetch_file(file_url):
+    """Obtiene el contenido de un archivo."""
+    try:
+        log.debug("fetch_file - Original URL: %s", file_url)
+        raw_url = to_raw_url(file_url)
+        log.debug("fetch_file - Raw URL: %s", raw_url)
+        
+        # Primero el almacén local de repos ingeridos; si no, el raw de GitHub
+        sha = _blob_shas.get(file_url)
+        content = get_store().read(sha) if sha else None
+        if content is None:
+            content = get_client().fetch_raw(raw_url, sha=sha)
+        if content is not None:
+            log.debug("fetch_file - Content length: %d", len(content))
+        return content
+    except Exception as e:
+        log.warning("fetch_file - Exception: %s", e)
+        return None
+
+def fetch_files(file_urls):
+    """Obtiene el contenido de varios archivos en paralelo (None si alguno falla)."""
+    log.debug("fetch_files - Fetching %d files", len(file_urls))
+    shas = [_blob_shas.get(url) for url in file_urls]
+    contents = [get_store().read(sha) if sha else None for sha in shas]
+    missing = [i for i, content in enumerate(contents) if content is None]
+    if missing:
+        fetched = get_client().fetch_files([to_raw_url(file_urls[i]) for i in missing],
+                                           [shas[i] for i in missing])
+        for i, content in zip(missing, fetched):
+            contents[i] = content
+    return contents
+
+def build_filtered_tree(tree_data, owner, repo, branch):
+    """Construye un árbol filtrado solo con archivos .py y .ipynb."""
+    log.debug("build_filtered_tree - Building tree for %s/%s", owner, repo)
+    tree = {}
+    count = 0
+    base_url = f"https://github.com/{owner}/{repo}/blob/{branch}/"
+    
+    for item in tree_data:
+        if item["type"] == "blob" and item["path"].endswith((".py", ".ipynb")):
+            path_parts = item["path"].split("/")
+            current_level = tree
+            for part in path_parts[:-1]:
+                current_level = current_level.setdefault(part, {})
+            file_url = base_url + item["path"]
+            _blob_shas.put(file_url, item.get("sha"))
+            count += 1
+            current_level[path_parts[-1]] = {
+                "url": file_url,
+                "path": item["path"],
+                "sha": item.get("sha"),
+                "type": "notebook" if item["path"].endswith(".ipynb") else "python"
+            }
+    
+    log.debug("build_filtered_tree - Added %d files", count)
+    return tree
+
+def _dir_html(name, indent_px, spec=None):
+    """HTML de un directorio; con `spec` es un enlace que lo abre."""
+    label = html.escape(name)
+    if spec is not None:
+        label = (f"<a href='#' onclick='openDirectory({html.escape(json.dumps(spec))}); return false;' "
+                 f"style='text-decoration: none; color: #666;'>{label}</a>")
+    return f"""
+                <div style='margin-left: {indent_px}px; margin-bottom: 5px;'>
+                    <span style='font-weight: bold; color: #666;'>📁 {label}</span>
+                </div>
+            """
+
+def _file_html(name, url, is_notebook, indent_px):
+    """HTML de un archivo con su botón de análisis."""
+    icon = "📓" if is_notebook else "🐍"
+    url = html.escape(url)
+    return f"""
+                <div style='margin-left: {indent_px}px; margin-bottom: 8px;'>
+                    <div style='display: flex; align-items: center; gap: 10px;'>
+                        <span>{icon}</span>
+                        <a href='{url}' target='_blank' style='text-decoration: none; color: #0366d6;'>
+                            {html.escape(name)}
+                        </a>
+                        <button onclick='selectAndAnalyze("{url}")' 
+                                style='padding: 4px 12px; border-radius: 4px; border: 1px solid #0366d6; 
+                                       background: white; color: #0366d6; cursor: pointer; 
+                                       transition: all 0.2s;'
+                                onmouseover='this.style.background="#0366d6"; this.style.color="white"'
+                                onmouseout='this.style.background="white"; this.style.color="#0366d6"'>
+                            Analyze
+                        </button>
+                    </div>
+                    <div style='margin-top: 4px; margin-left: 20px;'>
+                        <span style='color: #666; font-size: 0.9em; font-family: monospace;'>
+                            Path: {url}
+                        </span>
+                    </div>
+                </div>
+            """
+
+def fetch_tree_level(owner, repo, tree_sha):
+    """Obtiene las entradas (no recursivas) de un subárbol por su SHA."""
+    url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{tree_sha}"
+    response = get_client().api_get(url, immutable=True,
+                                    cache_key=f"tree:{owner}/{repo}:{tree_sha}:level")
+    log.debug("fetch_tree_level - Response status: %s", response.status_code)
+    if response.status_code == 200:
+        return response.json().get("tree", [])
+    return None
+
+def get_tree_index(owner, repo, branch):
+    """Devuelve el índice del árbol del commit actual, construyéndolo una sola vez."""
+    sha = get_branch_sha(owner, repo, branch)
+    key = f"{owner}/{repo}:{sha}"
+    index = tree_indexes.get(key) if sha else None
+    if index is not None:
+        return index
+    
+    repo_data = fetch_repo_structure(owner, repo, branch)
+    if not repo_data or "tree" not in repo_data:
+        return None
+    with span("tree_build", repo=f"{owner}/{repo}"):
+        index = TreeIndex.from_tree(repo_data,
+                                    loader=lambda tree_sha: fetch_tree_level(owner, repo, tree_sha))
+    index.base_url = f"https://github.com/{owner}/{repo}/blob/{branch}/"
+    log.debug("get_tree_index - Indexed %d files (truncated: %s)", len(index), index.truncated)
+    if sha:
+        tree_indexes.put(key, index)
+    return index
+
+def render_directory(index, dir_path="", page=0):
+    """Renderiza un único directorio del índice, paginado."""
+    with span("render_directory", path=dir_path):
+        return _render_directory(index, dir_path, page)
+
+def _render_directory(index, dir_path, page):
+    dirs, files = index.children(dir_path)
+    entries = [(name, True, None) for name in dirs] + [(name, False, sha) for name, sha in files]
+    pages = max(1, -(-len(entries) // DIR_PAGE_SIZE))
+    page = min(max(page, 0), pages - 1)
+    prefix = f"{dir_path}/" if dir_path else ""
+    
+    # Ruta de navegación: raíz / a / b
+    crumbs = [_dir_html("/", 0, "::0").strip()]
+    walked = []
+    for part in filter(None, dir_path.split("/")):
+        walked.append(part)
+        crumbs.append(_dir_html(part, 0, "/".join(walked) + "::0").strip())
+    parts = ["<div style='display: flex; gap: 6px; margin-bottom: 10px;'>", *crumbs, "</div>"]
+    
+    for name, is_dir, sha in entries[page * DIR_PAGE_SIZE:(page + 1) * DIR_PAGE_SIZE]:
+        if is_dir:
+            parts.append(_dir_html(name, 0, f"{prefix}{name}::0"))
+        else:
+            file_url = index.base_url + prefix + name
+            _blob_shas.put(file_url, sha)
+            parts.append(_file_html(name, file_url, name.endswith(".ipynb"), 0))
+    
+    if pages > 1:
+        nav = []
+        if page > 0:
+            nav.append(_dir_html("« Previous", 0, f"{dir_path}::{page - 1}").strip())
+        nav.append(f"<span style='color: #666;'>Page {page + 1} of {pages}</span>")
+        if page < pages - 1:
+            nav.append(_dir_html("Next »", 0, f"{dir_path}::{page + 1}").strip())
+        parts += ["<div style='display: flex; gap: 12px; align-items: center;'>", *nav, "</div>"]
+    return "".join(parts)
+
+# JavaScript para manejar la selección, el análisis y la navegación por directorios
+TREE_JS = """
+        <script>
+        function selectAndAnalyze(path) {
+            console.log('Analyzing path:', path);
+            const fileInput = document.querySelector('input[data-testid="Selected File Path"]');
+            if (fileInput) {
+                fileInput.value = path;
+                fileInput.dispatchEvent(new Event('input', { bubbles: true }));
+                
+                const analyzeButton = document.querySelector('button[data-testid="Analyze File"]');
+                if (analyzeButton) {
+                    console.log('Clicking analyze button');
+                    analyzeButton.click();
+                } else {
+                    console.log('Analyze button not found');
+                }
+            } else {
+                console.log('File input not found');
+            }
+        }
+        function openDirectory(spec) {
+            const dirInput = document.querySelector('#directory-path textarea, #directory-path input');
+            if (dirInput) {
+                dirInput.value = spec;
+                dirInput.dispatchEvent(new Event('input', { bubbles: true }));
+                const openButton = document.querySelector('#open-directory-button');
+                if (openButton) {
+                    openButton.click();
+                }
+            } else {
+                console.log('Directory input not found');
+            }
+        }
+        </script>
+        """
+
+def _repo_index(repo_full_name):
+    owner, repo = repo_full_name.split(" (")[0].split("/")
+    # Si la cuota de GitHub está agotada se dice, en lugar de "No files found"
+    branch = get_default_branch(owner, repo)
+    if not branch:
+        return None, get_client().rate_limit_message() or "Could not fetch repository structure"
+    index = get_tree_index(owner, repo, branch)
+    if index is None:
+        return None, get_client().rate_limit_message() or "No files found"
+    return index, None
+
+def get_files_structure(repo_full_name):
+    """Obtiene y formatea la estructura de archivos del repositorio."""
+    try:
+        log.debug("get_files_structure - Processing repo: %s", repo_full_name)
+        index, error = _repo_index(repo_full_name)
+        if error:
+            return error
+        
+        # Solo se renderiza la raíz; el resto de directorios se abren bajo demanda
+        return TREE_JS + render_directory(index)
+    except Exception as e:
+        log.exception("get_files_structure - Error: %s", e)
+        return f"Error: {str(e)}"
+
+def open_directory(repo_full_name, dir_spec):
+    """Renderiza el directorio indicado como `ruta::página`."""
+    try:
+        index, error = _repo_index(repo_full_name)
+        if error:
+            return error
+        dir_path, _, page = (dir_spec or "").rpartition("::")
+        return TREE_JS + render_directory(index, dir_path, int(page or 0))
+    except Exception as e:
+        log.exception("open_directory - Error: %s", e)
+        return f"Error: {str(e)}"
+
+# Índice de símbolos (persistente, por blob) y de rutas (en memoria, por árbol)
+# Archivos descargados por ronda de indexado; 0 lo desactiva
+SYMBOL_INDEX_MAX_FILES = int(os.getenv("SYMBOL_INDEX_MAX_FILES", "300"))
+SYMBOL_BATCH_SIZE = 32
+SEARCH_LIMIT = 30
+symbol_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="symbols")
+path_indexes = TreeIndexCache()
+# Tamaño del índice de árbol ya enviado a indexar, por SHA del árbol
+_symbol_sizes = {}
+_symbol_lock = threading.Lock()
+
+def schedule_symbol_index(index):
+    """Indexa en segundo plano los símbolos del árbol si hay archivos nuevos.
+
+    Solo se llama al buscar en el repositorio: navegar por el árbol no
+    descarga nada. En árboles truncados solo se conocen los directorios ya
+    abiertos; se vuelve a llamar al crecer el índice y solo se analizan los
+    blobs nuevos.
+    """
+    if SYMBOL_INDEX_MAX_FILES <= 0 or not index.sha:
+        return
+    size = len(index)
+    with _symbol_lock:
+        if _symbol_sizes.get(index.sha) == size:
+            return
+        _symbol_sizes[index.sha] = size
+    symbol_executor.submit(index_symbols, index)
+
+def index_symbols(index):
+    """Extrae con `ast` los símbolos de los blobs del árbol aún no analizados.
+
+    Cada ronda descarga como mucho SYMBOL_INDEX_MAX_FILES archivos y encola
+    la siguiente mientras queden pendientes, así el árbol entero acaba
+    indexado sin acaparar el hilo frente a otros repositorios.
+    """
+    try:
+        store = get_symbol_store()
+        store.set_tree(index.sha, index.files())
+        # Los blobs de commits anteriores ya están en el índice: solo se leen los cambiados
+        missing = store.missing_blobs(index.sha)
+        batch_round = missing[:SYMBOL_INDEX_MAX_FILES]
+        indexed = 0
+        with span("symbol_index", files=len(batch_round)):
+            for start in range(0, len(batch_round), SYMBOL_BATCH_SIZE):
+                batch = batch_round[start:start + SYMBOL_BATCH_SIZE]
+                urls = [index.base_url + path for path, _ in batch]
+                for url, (_, sha) in zip(urls, batch):
+                    _blob_shas.put(url, sha)
+                for (path, sha), content in zip(batch, fetch_files(urls)):
+                    if content is None:
+                        metrics.inc("symbol_index_blobs_total", result="error")
+                        continue
+                    store.add_blob(sha, extract_symbols(content, path.endswith(".ipynb")))
+                    metrics.inc("symbol_index_blobs_total", result="indexed")
+                    indexed += 1
+        log.debug("index_symbols - Indexed %d blobs, %d still pending",
+                  indexed, len(missing) - indexed)
+        if len(missing) > indexed:
+            if indexed:
+                symbol_executor.submit(index_symbols, index)
+            else:
+                # Ninguna descarga funcionó (p. ej. cuota agotada): se reintenta en la próxima búsqueda
+                with _symbol_lock:
+                    _symbol_sizes.pop(index.sha, None)
+    except Exception as e:
+        log.exception("index_symbols - Error: %s", e)
+        with _symbol_lock:
+            _symbol_sizes.pop(index.sha, None)
+
+def get_path_index(index):
+    """Índice de rutas del árbol, reconstruido si se han cargado más directorios."""
+    path_index = path_indexes.get(index.sha)
+    if path_index is None or len(path_index) != len(index):
+        path_index = PathIndex(index.paths())
+        path_indexes.put(index.sha, path_index)
+    return path_index
+
+def _symbol_html(kind, name, url, location):
+    """HTML de un símbolo encontrado; al pulsarlo se analiza su archivo."""
+    url = html.escape(url)
+    return f"""
+                <div style='margin-bottom: 6px; font-family: monospace;'>
+                    <span style='color: #6f42c1;'>{kind}</span>
+                    <a href='#' onclick='selectAndAnalyze("{url}"); return false;'
+                       style='text-decoration: none; color: #0366d6;'>{html.escape(name)}</a>
+                    <span style='color: #666; font-size: 0.9em;'>· {html.escape(location)}</span>
+                </div>
+            """
+
+def search_repository(repo_full_name, query):
+    """Busca archivos (por ruta) y símbolos (funciones, clases, imports) en el repositorio."""
+    try:
+        if not repo_full_name or not (query or "").strip():
+            return ""
+        index, error = _repo_index(repo_full_name)
+        if error:
+            return error
+        schedule_symbol_index(index)
+        with span("repo_search"):
+            paths = get_path_index(index).search(query, SEARCH_LIMIT)
+            symbols = get_symbol_store().search(index.sha, query, SEARCH_LIMIT) if index.sha else []
+        
+        parts = [f"<div style='font-weight: bold; margin-bottom: 6px;'>Files ({len(paths)})</div>"]
+        for path in paths:
+            file_url = index.base_url + path
+            _blob_shas.put(file_url, index.blob_sha(path))
+            parts.append(_file_html(path, file_url, path.endswith(".ipynb"), 0))
+        parts.append(f"<div style='font-weight: bold; margin: 10px 0 6px;'>Symbols ({len(symbols)})</div>")
+        for kind, name, path, line, cell in symbols:
+            file_url = index.base_url + path
+            _blob_shas.put(file_url, index.blob_sha(path))
+            location = f"{path}:{line}" if cell is None else f"{path} [cell {cell + 1}]:{line}"
+            parts.append(_symbol_html(kind, name, file_url, location))
+        
+        if index.sha:
+            # Se compara con el índice completo: archivos aún no registrados cuentan como pendientes
+            done, total = get_symbol_store().progress(index.sha)
+            total = max(total, len(index))
+            if done < total:
+                parts.append(f"<div style='color: #666;'>Indexing symbols: {done} of {total} files, "
+                             "symbol results are partial…</div>")
+        if index.truncated:
+            parts.append("<div style='color: #666;'>Large repository: only opened directories are indexed.</div>")
+        return TREE_JS + "".join(parts)
+    except Exception as e:
+        log.exception("search_repository - Error: %s", e)
+        return f"Error: {str(e)}"
+
+def annotate_source(source, template):
+    """Anota un fragmento de código con el LLM, reutilizando la caché si es posible."""
+    if annotation_cache is not None:
+        cached = annotation_cache.get(source, template, GROQ_MODEL)
+        if cached is not None:
+            metrics.inc("annotation_cache_total", result="hit")
+            return cached
+        metrics.inc("annotation_cache_total", result="miss")
+    response = invoke_with_retry(get_llm(), template.format(code=source), llm_limiter)
+    if annotation_cache is not None:
+        annotation_cache.set(source, template, GROQ_MODEL, response.content)
+    return response.content
+
+def stream_source(source, template):
+    """Como `annotate_source`, pero devuelve el texto acumulado según llega del LLM."""
+    if annotation_cache is not None:
+        cached = annotation_cache.get(source, template, GROQ_MODEL)
+        if cached is not None:
+            metrics.inc("annotation_cache_total", result="hit")
+            yield cached
+            return
+        metrics.inc("annotation_cache_total", result="miss")
+    parts = []
+    for chunk in stream_with_retry(get_llm(), template.format(code=source), llm_limiter):
+        parts.append(chunk.content)
+        yield "".join(parts)
+    if annotation_cache is not None:
+        annotation_cache.set(source, template, GROQ_MODEL, "".join(parts))
+
+def _cached_cell(source):
+    """Anotación cacheada de una celda, hecha sola o dentro de un lote."""
+    if annotation_cache is None:
+        return None
+    for template in (NOTEBOOK_PROMPT, NOTEBOOK_PACKED_PROMPT):
+        cached = annotation_cache.get(source, template, GROQ_MODEL)
+        if cached is not None:
+            metrics.inc("annotation_cache_total", result="hit")
+            return cached
+    metrics.inc("annotation_cache_total", result="miss")
+    return None
+
+def annotate_cells(sources):
+    """Anota varias celdas pequeñas con una sola petición al LLM.
+
+    Las celdas van separadas por delimitadores numerados y la respuesta se
+    reparte entre ellas; si no se puede separar, cada celda se anota por su
+    cuenta. Cada celda se cachea por separado.
+    """
+    results = [_cached_cell(source) for source in sources]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if len(missing) == 1:
+        results[missing[0]] = annotate_source(sources[missing[0]], NOTEBOOK_PROMPT)
+    elif missing:
+        pending = [sources[i] for i in missing]
+        prompt = NOTEBOOK_PACKED_PROMPT.format(code=join_cells(pending))
+        cells = split_cells(invoke_with_retry(get_llm(), prompt, llm_limiter).content, len(pending))
+        if cells is None:
+            log.info("annotate_cells - Could not split %d packed cells, annotating one by one",
+                     len(pending))
+            metrics.inc("notebook_pack_total", result="fallback")
+            cells = [annotate_source(source, NOTEBOOK_PROMPT) for source in pending]
+        else:
+            metrics.inc("notebook_pack_total", result="split")
+            if annotation_cache is not None:
+                for source, cell in zip(pending, cells):
+                    annotation_cache.set(source, NOTEBOOK_PACKED_PROMPT, GROQ_MODEL, cell)
+        for i, cell in zip(missing, cells):
+            results[i] = cell
+    return results
+
+def iter_annotated_notebook(content, strict=False):
+    """Anota las celdas de código en paralelo y devuelve el notebook tras cada celda.
+
+    Primero se devuelve el notebook original y después, según termina cada
+    celda (o lote de celdas pequeñas), el mismo nodo actualizado. Los fallos
+    son por petición y se anotan en la celda; con `strict` se relanzan.
+    """
+    import nbformat
+    nb = nbformat.reads(content, as_version=4)
+    code_cells = [cell for cell in nb.cells if cell.cell_type == "code"]
+    # Las celdas pequeñas consecutivas comparten petición; las grandes van solas
+    groups = pack_cells([cell.source for cell in code_cells])
+    log.debug("iter_annotated_notebook - Processing %d code cells in %d requests",
+              len(code_cells), len(groups))
+    # Cada celda se cachea por separado: solo las editadas llaman al LLM
+    futures = {}
+    for group in groups:
+        cells = [code_cells[i] for i in group]
+        if len(cells) == 1:
+            future = llm_executor.submit(annotate_source, cells[0].source, NOTEBOOK_PROMPT)
+        else:
+            future = llm_executor.submit(annotate_cells, [cell.source for cell in cells])
+        futures[future] = cells
+    yield nb
+    for future in as_completed(futures):
+        cells = futures[future]
+        try:
+            result = future.result()
+            for cell, annotated in zip(cells, [result] if len(cells) == 1 else result):
+                cell.source = annotated
+        except Exception as e:
+            log.warning("iter_annotated_notebook - Cells failed: %s", e)
+            if strict:
+                _cancel(futures)
+                raise
+            for cell in cells:
+                cell.source = f"# Error in code annotation: {str(e)}\n{cell.source}"
+        yield nb
+
+def iter_annotated_python(content, strict=False):
+    """Anota un fichero Python grande por fragmentos en paralelo.
+
+    El fichero se divide con `chunk_source` y se devuelve el texto completo
+    cada vez que termina un fragmento; los pendientes se muestran sin anotar.
+    Con `strict` el fallo de un fragmento se relanza en lugar de anotarse.
+    """
+    chunks = chunk_source(content)
+    log.debug("iter_annotated_python - Processing %d chunks", len(chunks))
+    results = list(chunks)
+    futures = {llm_executor.submit(annotate_source, chunk, PYTHON_PROMPT): index
+               for index, chunk in enumerate(chunks)}
+    for future in as_completed(futures):
+        index = futures[future]
+        try:
+            # Cada fragmento se cose con los demás: solo su código, sin vallas ni preámbulo
+            results[index] = strip_fences(future.result()).rstrip("\n") + "\n"
+        except Exception as e:
+            log.warning("iter_annotated_python - Chunk failed: %s", e)
+            if strict:
+                _cancel(futures)
+                raise
+            results[index] = f"# Error in code annotation: {str(e)}\n{chunks[index]}"
+        yield "".join(results)
+
+def _cancel(futures):
+    # Las peticiones aún en cola no llegan a enviarse al LLM
+    for future in futures:
+        future.cancel()
+
+def annotate_code(content, is_notebook=False, strict=False):
+    """Analiza y anota el código usando el LLM.
+
+    Con `strict` cualquier fallo (también el de una sola celda o fragmento)
+    se relanza en lugar de devolverse como texto.
+    """
+    try:
+        log.debug("annotate_code - Is notebook: %s, %d chars", is_notebook, len(content))
+        
+        if is_notebook:
+            import nbformat
+            for nb in iter_annotated_notebook(content, strict=strict):
+                pass
+            return nbformat.writes(nb)
+        else:
+            if len(chunk_source(content)) == 1:
+                return annotate_source(content, PYTHON_PROMPT)
+            for result in iter_annotated_python(content, strict=strict):
+                pass
+            return result
+    except Exception as e:
+        if strict:
+            raise
+        log.exception("annotate_code - Error: %s", e)
+        return f"Error in code annotation: {str(e)}"
+
+def analyze_file(repo_full_name, file_path):
+    """Analiza un archivo específico del repositorio."""
+    try:
+        log.debug("analyze_file - Starting analysis for repo: %s", repo_full_name)
+        log.debug("analyze_file - File path: %s", file_path)
+        
+        if not file_path:
+            log.debug("analyze_file - No file path provided")
+            return "Please select a file to analyze"
+        
+        # Usar el file_path completo que viene del selected_file
+        content = fetch_file(file_path)
+        log.debug("analyze_file - Content fetched: %s", "Yes" if content else "No")
+        
+        if content:
+            is_notebook = file_path.endswith('.ipynb')
+            log.debug("analyze_file - Is notebook: %s", is_notebook)
+            return annotate_code(content, is_notebook=is_notebook)
+        
+        log.warning("analyze_file - Could not fetch content")
+        return get_client().rate_limit_message() or "Error: Could not fetch file content"
+    except Exception as e:
+        log.exception("analyze_file - Error: %s", e)
+        return f"Error analyzing file: {str(e)}"
+
+def analyze_file_stream(repo_full_name, file_path):
+    """Como `analyze_file`, pero devuelve resultados parciales según avanza el LLM.
+
+    Los notebooks se devuelven como NotebookNode, no como texto.
+    """
+    try:
+        log.debug("analyze_file_stream - File path: %s", file_path)
+        if not file_path:
+            yield "Please select a file to analyze"
+            return
+        
+        content = fetch_file(file_path)
+        if not content:
+            yield get_client().rate_limit_message() or "Error: Could not fetch file content"
+            return
+        
+        if file_path.endswith('.ipynb'):
+            # Se devuelve el nodo tal cual: convert_notebook_to_html no necesita el JSON
+            yield from iter_annotated_notebook(content)
+        elif len(chunk_source(content)) == 1:
+            yield from stream_source(content, PYTHON_PROMPT)
+        else:
+            yield from iter_annotated_python(content)
+    except Exception as e:
+        log.exception("analyze_file_stream - Error: %s", e)
+        yield f"Error analyzing file: {str(e)}"
+
+def convert_notebook_to_html(notebook_content):
+    """Convierte un Jupyter Notebook (texto o nodo de nbformat) a HTML limpio."""
+    try:
+        # Exportador compartido y HTML memoizado por celda
+        html_output = get_renderer().render(notebook_content)
+        
+        styled_html = f"""
+        <style>
+            .notebook-container {{
+                max-width: 100%;
+                margin: 20px auto;
+                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Helvetica, Arial, sans-serif;
+            }}
+            .input_area {{
+                border: 1px solid #e1e4e8;
+                border-radius: 6px;
+                margin: 10px 0;
+                padding: 10px;
+                background: #f6f8fa;
+            }}
+            .input_area pre {{
+                margin: 0;
+                padding: 10px;
+                background: #f8f9fa;
+                font-family: monospace;
+                white-space: pre-wrap;
+            }}
+            .cell {{
+                margin: 20px 0;
+                padding: 10px;
+            }}
+        </style>
+        <div class="notebook-container">
+            {html_output}
+        </div>
+        """
+        return styled_html
+    except Exception as e:
+        log.exception("convert_notebook_to_html - Error: %s", e)
+        return f"<p>Error al convertir el notebook: {str(e)}</p>"
@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "GITHUB_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "github_explorer", "github_cache.sqlite"))
+DEFAULT_MAX_BYTES = int(os.getenv("GITHUB_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    etag TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    immutable INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+"""
+
+
+class CacheEntry:
+    """Entrada leída de la caché."""
+
+    def __init__(self, key, body, etag, fetched_at, immutable):
+        self.key = key
+        self.body = body
+        self.etag = etag
+        self.fetched_at = fetched_at
+        self.immutable = bool(immutable)
+
+    def is_fresh(self, ttl):
+        """Indica si la entrada puede servirse sin revalidar."""
+        if self.immutable:
+            return True
+        return ttl is not None and time.time() - self.fetched_at < ttl
+
+
+class GitHubCache:
+    """Caché persistente en SQLite para respuestas de GitHub.
+
+    Las entradas inmutables (árboles por commit SHA, blobs por blob SHA) no
+    caducan nunca; el resto se sirven durante su TTL y después se revalidan
+    con `If-None-Match`. El tamaño total está acotado con expulsión LRU.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self.counters = {"hits": 0, "misses": 0, "revalidated": 0,
+                         "stores": 0, "evictions": 0}
+
+    def get(self, key):
+        """Devuelve la entrada de `key` (o None) y actualiza su uso LRU."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, body, etag, fetched_at, immutable FROM entries WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?",
+                               (time.time(), key))
+            self._conn.commit()
+        return CacheEntry(*row)
+
+    def put(self, key, body, etag=None, immutable=False):
+        """Guarda `body` (bytes) bajo `key` y expulsa entradas si hace falta."""
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?",
+                                     (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, body, etag, fetched_at, accessed_at, size, immutable) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, body, etag, now, now, len(body), int(immutable)))
+            self._total += len(body) - (old[0] if old else 0)
+            self.counters["stores"] += 1
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, key):
+        """Marca una entrada como recién revalidada (respuesta 304)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, key))
+            self._conn.commit()
+
+    def record(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def _evict(self):
+        # Llamado con el lock tomado: expulsa las entradas menos usadas
+        while self._total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at LIMIT 64").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._total -= size
+                self.counters["evictions"] += 1
+                if self._total <= self.max_bytes:
+                    break
+
+    def stats(self):
+        """Contadores de aciertos/fallos y ocupación actual."""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return dict(self.counters, entries=count, bytes=self._total,
+                        max_bytes=self.max_bytes)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._total = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
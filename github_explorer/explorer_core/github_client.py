@@ -0,0 +1,221 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .github_cache import GitHubCache
+from .github_governor import SingleFlight, get_governor, resource_for, token_key
+from .telemetry import log, metrics, span
+
+API_URL = "https://api.github.com"
+
+# Timeouts por defecto: (conexión, lectura) en segundos
+DEFAULT_TIMEOUT = (float(os.getenv("GITHUB_CONNECT_TIMEOUT", "5")),
+                   float(os.getenv("GITHUB_READ_TIMEOUT", "30")))
+DEFAULT_MAX_WORKERS = int(os.getenv("GITHUB_MAX_WORKERS", "8"))
+
+# TTLs (segundos) para datos mutables; árboles y blobs por SHA no caducan
+REPO_TTL = int(os.getenv("GITHUB_REPO_TTL", "600"))
+BRANCH_TTL = int(os.getenv("GITHUB_BRANCH_TTL", "60"))
+SEARCH_TTL = int(os.getenv("GITHUB_SEARCH_TTL", "300"))
+RAW_TTL = int(os.getenv("GITHUB_RAW_TTL", "60"))
+
+
+class CachedResponse:
+    """Respuesta servida desde la caché con la interfaz mínima de `requests`."""
+
+    def __init__(self, status_code, content, from_cache=True):
+        self.status_code = status_code
+        self.content = content
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class GitHubClient:
+    """Cliente HTTP compartido para la API de GitHub y los ficheros raw.
+
+    Mantiene un único pool de conexiones keep-alive, de modo que las llamadas
+    sucesivas reutilizan la conexión TLS en lugar de abrir una nueva.
+    """
+
+    def __init__(self, token=None, timeout=DEFAULT_TIMEOUT,
+                 max_workers=DEFAULT_MAX_WORKERS, pool_size=None, cache=None,
+                 governor=None, url_rewrites=None):
+        self.token = token
+        # Prefijos de URL a redirigir, p. ej. a un GitHub local en los benchmarks
+        self.url_rewrites = dict(url_rewrites or {})
+        self.token_key = token_key(token)
+        self.cache = cache
+        self.governor = governor or get_governor()
+        # Peticiones idénticas simultáneas (p. ej. varias sesiones) se hacen una vez
+        self.flights = SingleFlight()
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4,
+                              pool_maxsize=pool_size or max_workers * 2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="github")
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        """GET sobre el pool compartido con el timeout configurado."""
+        kwargs.setdefault("timeout", self.timeout)
+        for prefix, target in self.url_rewrites.items():
+            if url.startswith(prefix):
+                url = target + url[len(prefix):]
+                break
+        kind = "raw" if "raw.githubusercontent.com" in url else "api"
+        with span("github_request", url=url):
+            response = self.session.get(url, params=params, headers=headers, **kwargs)
+        metrics.inc("github_requests_total", kind=kind, status=response.status_code)
+        if kwargs.get("stream"):
+            # El cuerpo aún no se ha leído: se cuenta lo que anuncia el servidor
+            size = int(response.headers.get("Content-Length") or 0)
+        else:
+            size = len(response.content)
+        metrics.inc("github_response_bytes_total", size, kind=kind)
+        return response
+
+    def api_get(self, path, params=None, headers=None, ttl=None, immutable=False,
+                cache_key=None, **kwargs):
+        """GET contra la API REST de GitHub (`path` relativo a api.github.com).
+
+        Si se indica `ttl` o `immutable` la respuesta pasa por la caché. Todas
+        las peticiones pasan por el planificador de cuota y, salvo las de
+        streaming, las idénticas y simultáneas se agrupan en una sola.
+        """
+        url = path if path.startswith("http") else f"{API_URL}/{path.lstrip('/')}"
+        merged = {"Accept": "application/vnd.github+json"}
+        merged.update(headers or {})
+        if kwargs.get("stream"):
+            return self._api_request(url, params, merged, **kwargs)
+        query = f"?{urlencode(sorted(params.items()))}" if params else ""
+        if self.cache is None or (ttl is None and not immutable):
+            return self.flights.do(f"get:{url}{query}", lambda: self._api_request(
+                url, params, merged, **kwargs))
+        cache_key = cache_key or f"api:{url}{query}"
+        return self.flights.do(cache_key, lambda: self._cached_get(
+            cache_key, url, params, merged, ttl, immutable, send=self._api_request, **kwargs))
+
+    def _api_request(self, url, params, headers, **kwargs):
+        resource = resource_for(url)
+        self.governor.acquire(self.token_key, resource)
+        response = self.get(url, params=params, headers=headers, **kwargs)
+        self.governor.update(self.token_key, resource, response)
+        return response
+
+    def _cached_get(self, key, url, params, headers, ttl, immutable, send=None, **kwargs):
+        entry = self.cache.get(key)
+        if entry is not None and entry.is_fresh(ttl):
+            self.cache.record("hits")
+            metrics.inc("github_cache_total", result="hit")
+            return CachedResponse(200, entry.body)
+
+        headers = dict(headers or {})
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        send = send or (lambda u, p, h, **kw: self.get(u, params=p, headers=h, **kw))
+        response = send(url, params, headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            # Revalidación: un 304 condicional no consume cuota de la API
+            self.cache.touch(key)
+            self.cache.record("revalidated")
+            metrics.inc("github_cache_total", result="revalidated")
+            return CachedResponse(200, entry.body)
+        self.cache.record("misses")
+        metrics.inc("github_cache_total", result="miss")
+        if response.status_code == 200:
+            self.cache.put(key, response.content, response.headers.get("ETag"), immutable)
+        return response
+
+    def fetch_raw(self, raw_url, sha=None):
+        """Descarga un fichero raw y devuelve su texto, o None si falla.
+
+        Si se conoce el blob `sha` el contenido se cachea como inmutable.
+        """
+        return self.flights.do(f"raw:{raw_url}:{sha}", lambda: self._fetch_raw(raw_url, sha))
+
+    def _fetch_raw(self, raw_url, sha):
+        try:
+            if self.cache is None:
+                response = self.get(raw_url)
+            elif sha:
+                response = self._cached_get(f"blob:{sha}", raw_url, None, None, None, True)
+            else:
+                response = self._cached_get(f"raw:{raw_url}", raw_url, None, None, RAW_TTL, False)
+        except requests.RequestException as e:
+            log.warning("GitHubClient.fetch_raw - Exception: %s", e)
+            return None
+        if response.status_code == 200:
+            return response.text
+        log.info("GitHubClient.fetch_raw - %s -> %s", raw_url, response.status_code)
+        return None
+
+    def fetch_files(self, raw_urls, shas=None):
+        """Descarga varios ficheros raw en paralelo, conservando el orden."""
+        shas = shas or [None] * len(raw_urls)
+        return list(self._executor.map(self.fetch_raw, raw_urls, shas))
+
+    async def afetch_file(self, raw_url, sha=None):
+        """Versión asíncrona de `fetch_raw`."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.fetch_raw, raw_url, sha)
+
+    async def afetch_files(self, raw_urls, shas=None):
+        """Versión asíncrona de `fetch_files`."""
+        shas = shas or [None] * len(raw_urls)
+        return await asyncio.gather(*(self.afetch_file(url, sha)
+                                      for url, sha in zip(raw_urls, shas)))
+
+    def rate_limit_status(self):
+        """Cuota conocida de GitHub y peticiones agrupadas o en espera."""
+        return {"quotas": self.governor.snapshot(), "waits": self.governor.waits,
+                "waited_s": round(self.governor.waited, 1),
+                "coalesced": self.flights.coalesced}
+
+    def rate_limit_message(self):
+        """Mensaje legible si la cuota de este token está agotada, o None."""
+        return self.governor.block_message(self.token_key)
+
+    def cache_stats(self):
+        """Contadores de la caché (vacío si está desactivada)."""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_client = None
+
+
+def set_client(client):
+    """Sustituye el cliente compartido (p. ej. por uno contra un GitHub local)."""
+    global _client
+    _client = client
+
+
+def get_client():
+    """Devuelve el cliente compartido del proceso, creándolo la primera vez."""
+    global _client
+    if _client is None:
+        cache = None if os.getenv("GITHUB_CACHE_DISABLED") else GitHubCache()
+        _client = GitHubClient(token=os.getenv("GITHUB_TOKEN"), cache=cache)
+    return _client
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import threading
+import time
+
+from .telemetry import log, metrics
+
+# Peticiones que se dejan sin gastar antes de empezar a esperar al reset
+RATE_RESERVE = int(os.getenv("GITHUB_RATE_RESERVE", "2"))
+# Espera máxima antes de rendirse con RateLimitExceeded (segundos)
+MAX_RATE_WAIT = float(os.getenv("GITHUB_MAX_RATE_WAIT", "30"))
+# Pausa ante un límite secundario sin Retry-After
+SECONDARY_BACKOFF = 60.0
+
+
+class RateLimitExceeded(Exception):
+    """La cuota de GitHub está agotada y el reset queda demasiado lejos."""
+
+    def __init__(self, resource, wait):
+        self.resource = resource
+        self.wait = wait
+        super().__init__(f"GitHub rate limit for '{resource}' exhausted; "
+                         f"resets in {int(wait)}s")
+
+
+def token_key(token):
+    """Identificador de la cuota de un token (sin guardar el token)."""
+    if not token:
+        return "anonymous"
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:12]
+
+
+def resource_for(url):
+    """Recurso de rate limit al que se imputa una URL de la API."""
+    return "search" if "/search/" in url else "core"
+
+
+class QuotaState:
+    """Estado de cuota conocido para un (token, recurso)."""
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset = 0.0
+        self.blocked_until = 0.0
+
+    def as_dict(self):
+        return {"limit": self.limit, "remaining": self.remaining,
+                "reset": self.reset, "blocked_until": self.blocked_until}
+
+
+class RateLimitGovernor:
+    """Planificador central de la cuota de GitHub por token y recurso.
+
+    Lee `X-RateLimit-*` y `Retry-After` de cada respuesta y, antes de cada
+    petición, espera al reset si la cuota está a punto de agotarse.
+    """
+
+    def __init__(self, reserve=RATE_RESERVE, max_wait=MAX_RATE_WAIT):
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.waits = 0
+        self.waited = 0.0
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, token, resource):
+        """Reserva una petición; bloquea o lanza RateLimitExceeded si no hay cuota."""
+        with self._lock:
+            state = self._states.setdefault((token, resource), QuotaState())
+            now = time.time()
+            wait = 0.0
+            if state.blocked_until > now:
+                wait = state.blocked_until - now
+            elif state.remaining is not None and state.remaining <= self.reserve:
+                wait = max(0.0, state.reset - now)
+            if wait == 0.0 and state.remaining is not None:
+                # Descuento optimista hasta que llegue la respuesta
+                state.remaining -= 1
+        if wait > self.max_wait:
+            raise RateLimitExceeded(resource, wait)
+        if wait > 0:
+            log.info("RateLimitGovernor - Waiting %.1fs for '%s' quota", wait, resource)
+            with self._lock:
+                self.waits += 1
+                self.waited += wait
+            metrics.inc("github_rate_waits_total", resource=resource)
+            metrics.inc("github_rate_wait_seconds_total", wait, resource=resource)
+            time.sleep(wait)
+
+    def update(self, token, resource, response):
+        """Actualiza la cuota con las cabeceras de `response`."""
+        headers = response.headers
+        resource = headers.get("X-RateLimit-Resource", resource)
+        now = time.time()
+        with self._lock:
+            state = self._states.setdefault((token, resource), QuotaState())
+            if "X-RateLimit-Remaining" in headers:
+                state.remaining = int(headers["X-RateLimit-Remaining"])
+                state.limit = int(headers.get("X-RateLimit-Limit", state.limit or 0))
+                state.reset = float(headers.get("X-RateLimit-Reset", state.reset))
+            if response.status_code in (403, 429):
+                retry_after = headers.get("Retry-After")
+                if retry_after is not None:
+                    state.blocked_until = now + float(retry_after)
+                elif state.remaining == 0:
+                    state.blocked_until = state.reset
+                elif response.status_code == 429 or "rate limit" in response.text.lower():
+                    state.blocked_until = now + SECONDARY_BACKOFF
+
+    def block_message(self, token):
+        """Mensaje legible si alguna cuota del token está bloqueada, o None."""
+        now = time.time()
+        with self._lock:
+            for (key, resource), state in self._states.items():
+                until = max(state.blocked_until,
+                            state.reset if state.remaining == 0 else 0.0)
+                if key == token and until > now:
+                    return str(RateLimitExceeded(resource, until - now))
+        return None
+
+    def snapshot(self):
+        """Estado actual de todas las cuotas conocidas."""
+        with self._lock:
+            return {f"{key}:{resource}": state.as_dict()
+                    for (key, resource), state in self._states.items()}
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Agrupa llamadas concurrentes idénticas en una sola ejecución."""
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            metrics.inc("github_coalesced_total")
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+
+_governor = None
+
+
+def get_governor():
+    """Devuelve el planificador compartido por todos los clientes del proceso."""
+    global _governor
+    if _governor is None:
+        _governor = RateLimitGovernor()
+    return _governor
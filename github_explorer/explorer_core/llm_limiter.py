@@ -0,0 +1,131 @@
+import os
+import random
+import threading
+import time
+
+from .telemetry import log, metrics, span
+
+# Límites del proveedor (peticiones y tokens por minuto)
+DEFAULT_RPM = int(os.getenv("GROQ_RPM", "30"))
+DEFAULT_TPM = int(os.getenv("GROQ_TPM", "6000"))
+DEFAULT_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "5"))
+
+
+def estimate_tokens(text):
+    """Estimación barata de tokens (~4 caracteres por token)."""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """Token bucket que se recarga a `rate_per_minute` hasta `capacity`.
+
+    `reserve` descuenta inmediatamente y devuelve cuánto hay que esperar, de
+    modo que las peticiones concurrentes quedan encoladas en orden de llegada.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+
+class RateLimiter:
+    """Limitador combinado de peticiones/minuto y tokens/minuto."""
+
+    def __init__(self, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.waited = 0.0
+
+    def acquire(self, tokens):
+        """Bloquea hasta que haya cupo para una petición de `tokens` tokens."""
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        if wait > 0:
+            self.waited += wait
+            metrics.inc("llm_rate_wait_seconds_total", wait)
+            time.sleep(wait)
+
+
+def _is_rate_limited(error):
+    status = getattr(error, "status_code", None) or getattr(
+        getattr(error, "response", None), "status_code", None)
+    return status == 429 or "rate limit" in str(error).lower() or "429" in str(error)
+
+
+def _retry_after(error):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(error, attempt):
+    delay = _retry_after(error) or min(60.0, 2 ** attempt) + random.uniform(0, 1)
+    log.info("llm_limiter - Rate limited, retrying in %.1fs", delay)
+    metrics.inc("llm_retries_total")
+    time.sleep(delay)
+
+
+def invoke_with_retry(llm, prompt, limiter=None, max_retries=DEFAULT_MAX_RETRIES):
+    """Llama a `llm.invoke` respetando el limitador y reintentando los 429."""
+    # La respuesta suele ocupar lo mismo que el código: se reservan ambos
+    tokens = estimate_tokens(prompt) * 2
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire(tokens)
+        try:
+            with span("llm_call"):
+                response = llm.invoke(prompt)
+        except Exception as e:
+            if attempt == max_retries or not _is_rate_limited(e):
+                metrics.inc("llm_requests_total", status="error")
+                raise
+            metrics.inc("llm_requests_total", status="rate_limited")
+            _backoff(e, attempt)
+            continue
+        metrics.inc("llm_requests_total", status="ok")
+        metrics.inc("llm_tokens_total", estimate_tokens(prompt), direction="in")
+        metrics.inc("llm_tokens_total", estimate_tokens(response.content), direction="out")
+        return response
+
+
+def stream_with_retry(llm, prompt, limiter=None, max_retries=DEFAULT_MAX_RETRIES):
+    """Como `invoke_with_retry`, pero devuelve los fragmentos según llegan.
+
+    Solo se reintenta si el 429 llega antes del primer fragmento.
+    """
+    tokens = estimate_tokens(prompt) * 2
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire(tokens)
+        started = False
+        received = 0
+        try:
+            with span("llm_stream"):
+                for chunk in llm.stream(prompt):
+                    started = True
+                    received += len(chunk.content)
+                    yield chunk
+        except Exception as e:
+            if started or attempt == max_retries or not _is_rate_limited(e):
+                metrics.inc("llm_requests_total", status="error")
+                raise
+            metrics.inc("llm_requests_total", status="rate_limited")
+            _backoff(e, attempt)
+            continue
+        metrics.inc("llm_requests_total", status="ok")
+        metrics.inc("llm_tokens_total", estimate_tokens(prompt), direction="in")
+        metrics.inc("llm_tokens_total", max(1, received // 4), direction="out")
+        return
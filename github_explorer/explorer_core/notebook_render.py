@@ -0,0 +1,129 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from .telemetry import metrics, span
+
+DEFAULT_MAX_CELLS = int(os.getenv("NOTEBOOK_RENDER_CACHE_CELLS", "4096"))
+
+
+def cell_key(cell, language):
+    """Clave direccionada por contenido de una celda renderizada."""
+    digest = hashlib.sha256()
+    for part in (cell.cell_type, language or "", cell.source):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def split_document(html_doc):
+    """Separa el HTML exportado en (cabecera, celdas, cierre).
+
+    nbconvert 7 envuelve las celdas en un documento completo con todo el CSS
+    en línea; las celdas van dentro de `<main>`. Si no hay `<main>` (otras
+    plantillas o versiones) todo el HTML se considera cuerpo.
+    """
+    start = html_doc.find("<main>")
+    end = html_doc.rfind("</main>")
+    if start == -1 or end < start:
+        return "", html_doc, ""
+    start += len("<main>")
+    return html_doc[:start], html_doc[start:end], html_doc[end:]
+
+
+class NotebookRenderer:
+    """Renderizador de notebooks a HTML con un único exportador reutilizable.
+
+    El `HTMLExporter` se crea y calienta una sola vez (la plantilla se carga
+    en el primer render) y solo se memoiza el cuerpo de cada celda: el
+    documento con el CSS se renderiza una vez por lenguaje y las celdas se
+    insertan en él, así que al volver a renderizar un notebook tras anotar
+    una celda solo se renderiza esa.
+    """
+
+    def __init__(self, max_cells=DEFAULT_MAX_CELLS):
+        self.max_cells = max_cells
+        self._cells = OrderedDict()
+        # lenguaje -> (cabecera, cierre) del documento
+        self._shells = {}
+        self._exporter = None
+        # El exportador no es seguro entre hilos
+        self._lock = threading.Lock()
+
+    def _get_exporter(self):
+        # Llamado con el lock tomado
+        if self._exporter is None:
+            # nbconvert tarda en importarse: solo se carga al renderizar
+            from nbconvert import HTMLExporter
+            from nbformat.v4 import new_notebook
+            exporter = HTMLExporter()
+            exporter.template_name = 'basic'
+            exporter.exclude_input = False
+            exporter.exclude_output = True  # Excluir outputs
+            # Calentar: carga la plantilla y el entorno de Jinja
+            exporter.from_notebook_node(new_notebook())
+            self._exporter = exporter
+        return self._exporter
+
+    def _get_shell(self, metadata, language):
+        # Llamado con el lock tomado
+        shell = self._shells.get(language)
+        if shell is None:
+            from nbformat.v4 import new_notebook
+            html_doc, _ = self._get_exporter().from_notebook_node(new_notebook(metadata=metadata))
+            head, _, tail = split_document(html_doc)
+            shell = self._shells[language] = (head, tail)
+        return shell
+
+    def warm(self):
+        """Crea el exportador por adelantado (p. ej. al arrancar la app)."""
+        with self._lock:
+            self._get_exporter()
+
+    def render_cell(self, cell, metadata):
+        from nbformat.v4 import new_notebook
+        language = metadata.get("language_info", {}).get("name", "python")
+        key = cell_key(cell, language)
+        with self._lock:
+            html_cell = self._cells.get(key)
+            if html_cell is not None:
+                self._cells.move_to_end(key)
+                metrics.inc("notebook_cell_cache_total", result="hit")
+                return html_cell
+            metrics.inc("notebook_cell_cache_total", result="miss")
+            single = new_notebook(cells=[cell], metadata=metadata)
+            html_doc, _ = self._get_exporter().from_notebook_node(single)
+            html_cell = split_document(html_doc)[1]
+            self._cells[key] = html_cell
+            while len(self._cells) > self.max_cells:
+                self._cells.popitem(last=False)
+            return html_cell
+
+    def render(self, nb):
+        """HTML de `nb` (un NotebookNode o su texto JSON) en un único documento."""
+        if isinstance(nb, str):
+            import nbformat
+            nb = nbformat.reads(nb, as_version=4)
+        with span("notebook_render"):
+            cells = "".join(self.render_cell(cell, nb.metadata) for cell in nb.cells)
+            language = nb.metadata.get("language_info", {}).get("name", "python")
+            with self._lock:
+                head, tail = self._get_shell(nb.metadata, language)
+            return head + cells + tail
+
+    def clear(self):
+        with self._lock:
+            self._cells.clear()
+            self._shells.clear()
+
+
+_renderer = None
+
+
+def get_renderer():
+    """Devuelve el renderizador compartido del proceso."""
+    global _renderer
+    if _renderer is None:
+        _renderer = NotebookRenderer()
+    return _renderer
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import tarfile
+import threading
+
+from .github_client import get_client
+from .telemetry import log, span
+
+DEFAULT_STORE_PATH = os.getenv(
+    "REPO_STORE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "github_explorer", "repo_store"))
+EXTENSIONS = (".py", ".ipynb")
+
+
+def git_blob_sha(data):
+    """SHA de blob de git: coincide con el `sha` de la API de árboles."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class RepoStore:
+    """Almacén local direccionado por contenido de los .py/.ipynb de un repo.
+
+    Cada commit ingerido tiene un manifiesto ruta -> sha del blob, y los
+    blobs se guardan una sola vez aunque aparezcan en varios commits.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_PATH):
+        self.root = root
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._manifests = {}
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root, "commits"), exist_ok=True)
+
+    def _object_path(self, sha):
+        return os.path.join(self.root, "objects", sha[:2], sha[2:])
+
+    def _manifest_path(self, owner, repo, commit_sha):
+        return os.path.join(self.root, "commits", f"{owner}__{repo}__{commit_sha}.json")
+
+    def _lock_for(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def has_blob(self, sha):
+        return bool(sha) and os.path.exists(self._object_path(sha))
+
+    def read(self, sha):
+        """Devuelve el texto del blob `sha`, o None si no está en el almacén."""
+        if not self.has_blob(sha):
+            return None
+        with open(self._object_path(sha), "rb") as f:
+            return f.read().decode("utf-8", errors="replace")
+
+    def write(self, data):
+        sha = git_blob_sha(data)
+        path = self._object_path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return sha
+
+    def manifest(self, owner, repo, commit_sha):
+        """Manifiesto ruta -> sha de un commit ya ingerido (o None)."""
+        key = (owner, repo, commit_sha)
+        if key in self._manifests:
+            return self._manifests[key]
+        path = self._manifest_path(owner, repo, commit_sha)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        self._manifests[key] = manifest
+        return manifest
+
+    def ingest(self, owner, repo, commit_sha, client=None):
+        """Descarga el tarball del commit y guarda solo los .py/.ipynb.
+
+        El tarball se procesa en streaming (`r|gz`), miembro a miembro, sin
+        extraerlo ni cargarlo entero en memoria.
+        """
+        with self._lock_for((owner, repo, commit_sha)):
+            manifest = self.manifest(owner, repo, commit_sha)
+            if manifest is not None:
+                return manifest
+            client = client or get_client()
+            log.info("RepoStore.ingest - Downloading %s/%s@%s", owner, repo, commit_sha)
+            response = client.api_get(f"repos/{owner}/{repo}/tarball/{commit_sha}", stream=True)
+            if response.status_code != 200:
+                log.warning("RepoStore.ingest - Error response: %s", response.status_code)
+                response.close()
+                return None
+            manifest = {}
+            try:
+                with span("repo_ingest", repo=f"{owner}/{repo}"), \
+                        tarfile.open(fileobj=response.raw, mode="r|gz") as archive:
+                    for member in archive:
+                        if not member.isfile() or not member.name.endswith(EXTENSIONS):
+                            continue
+                        # Los miembros van bajo un directorio raíz "<owner>-<repo>-<sha>/"
+                        path = member.name.split("/", 1)[-1]
+                        manifest[path] = self.write(archive.extractfile(member).read())
+            finally:
+                response.close()
+            target = self._manifest_path(owner, repo, commit_sha)
+            with open(f"{target}.tmp", "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(f"{target}.tmp", target)
+            self._manifests[(owner, repo, commit_sha)] = manifest
+            log.info("RepoStore.ingest - Stored %d files", len(manifest))
+            return manifest
+
+    def tree_data(self, owner, repo, commit_sha):
+        """Manifiesto con el formato de `git/trees` (solo blobs .py/.ipynb)."""
+        manifest = self.manifest(owner, repo, commit_sha)
+        if manifest is None:
+            return None
+        return {
+            "sha": commit_sha,
+            "truncated": False,
+            "tree": [{"path": path, "type": "blob", "sha": sha}
+                     for path, sha in sorted(manifest.items())],
+        }
+
+
+_store = None
+
+
+def get_store():
+    """Devuelve el almacén compartido del proceso."""
+    global _store
+    if _store is None:
+        _store = RepoStore()
+    return _store
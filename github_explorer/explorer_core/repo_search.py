@@ -0,0 +1,97 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+SEARCH_PER_PAGE = int(os.getenv("SEARCH_PER_PAGE", "30"))
+MAX_SEARCH_RESULTS = int(os.getenv("MAX_SEARCH_RESULTS", "500"))
+
+# Descarga en segundo plano de la página siguiente mientras se lee la actual
+_prefetcher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="search-prefetch")
+
+
+def format_repo_choice(repo):
+    """Texto de un repositorio en el desplegable."""
+    return f"{repo['full_name']} (⭐ {repo['stars']}) - {repo['language']}"
+
+
+class SearchCursor:
+    """Cursor sobre las páginas de una búsqueda.
+
+    `fetch_page(search_type, query, page, per_page)` devuelve
+    `(repos, hay_más)`; como sus respuestas se cachean con un TTL corto, la
+    precarga de la página siguiente deja la respuesta lista para `next`.
+    """
+
+    def __init__(self, fetch_page, search_type, query, per_page=SEARCH_PER_PAGE):
+        self.fetch_page = fetch_page
+        self.search_type = search_type
+        self.query = query
+        self.per_page = per_page
+        self.page = 0
+        self.has_next = True
+
+    def next(self):
+        """Devuelve la siguiente página de resultados ([] si no hay más)."""
+        if not self.has_next:
+            return []
+        # La página solo avanza si llega: tras un error se reintenta la misma
+        repos, self.has_next = self.fetch_page(self.search_type, self.query,
+                                               self.page + 1, self.per_page)
+        self.page += 1
+        if self.has_next:
+            _prefetcher.submit(self.fetch_page, self.search_type, self.query,
+                               self.page + 1, self.per_page)
+        return repos
+
+
+class RepoSearch:
+    """Sesión de búsqueda con resultados deduplicados entre modos.
+
+    Los repositorios encontrados por Topic, Name o Username se acumulan una
+    sola vez (por `full_name`); los de la última búsqueda aparecen primero.
+    """
+
+    def __init__(self, fetch_page, max_results=MAX_SEARCH_RESULTS):
+        self.fetch_page = fetch_page
+        self.max_results = max_results
+        self.results = OrderedDict()
+        self.cursor = None
+
+    @property
+    def has_more(self):
+        return self.cursor is not None and self.cursor.has_next
+
+    def search(self, search_type, query):
+        """Inicia una búsqueda y devuelve las opciones del desplegable."""
+        if not query:
+            return self.choices()
+        if search_type == "Direct Path":
+            self.cursor = None
+            if "/" in query:
+                self._merge([{"full_name": query}], first=True)
+            return self.choices()
+        self.cursor = SearchCursor(self.fetch_page, search_type, query)
+        self._merge(self.cursor.next(), first=True)
+        return self.choices()
+
+    def more(self):
+        """Añade la siguiente página de la búsqueda actual."""
+        if self.has_more:
+            self._merge(self.cursor.next(), first=False)
+        return self.choices()
+
+    def _merge(self, repos, first):
+        if first:
+            merged = OrderedDict((repo["full_name"], repo) for repo in repos)
+            for name, repo in self.results.items():
+                merged.setdefault(name, repo)
+            self.results = merged
+        else:
+            for repo in repos:
+                self.results.setdefault(repo["full_name"], repo)
+        while len(self.results) > self.max_results:
+            self.results.popitem(last=True)
+
+    def choices(self):
+        return [format_repo_choice(repo) if "stars" in repo else repo["full_name"]
+                for repo in self.results.values()]
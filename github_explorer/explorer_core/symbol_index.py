@@ -0,0 +1,222 @@
+import ast
+import bisect
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from .github_cache import DEFAULT_CACHE_PATH as GITHUB_CACHE_PATH
+
+# Junto a la caché de blobs de GitHub
+DEFAULT_INDEX_PATH = os.getenv(
+    "SYMBOL_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(GITHUB_CACHE_PATH)), "symbols.sqlite"))
+DEFAULT_LIMIT = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    blob_sha TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    blob_sha TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    cell INTEGER
+);
+CREATE TABLE IF NOT EXISTS tree_files (
+    tree_sha TEXT NOT NULL,
+    path TEXT NOT NULL,
+    blob_sha TEXT NOT NULL,
+    PRIMARY KEY (tree_sha, path)
+);
+CREATE INDEX IF NOT EXISTS symbols_name ON symbols (name_lower);
+CREATE INDEX IF NOT EXISTS symbols_blob ON symbols (blob_sha);
+CREATE INDEX IF NOT EXISTS tree_files_blob ON tree_files (tree_sha, blob_sha);
+"""
+
+# Magias de IPython (%, !) que `ast` no entiende
+_MAGIC_RE = re.compile(r"^\s*[%!].*$", re.MULTILINE)
+
+
+def _python_symbols(source, cell=None):
+    """(tipo, nombre, línea, celda) de funciones, clases e imports de `source`."""
+    try:
+        tree = ast.parse(_MAGIC_RE.sub("", source))
+    except (SyntaxError, ValueError):
+        return []
+    symbols = []
+
+    def visit(nodes, prefix):
+        for node in nodes:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                symbols.append(("function", prefix + node.name, node.lineno, cell))
+            elif isinstance(node, ast.ClassDef):
+                symbols.append(("class", prefix + node.name, node.lineno, cell))
+                visit(node.body, f"{prefix}{node.name}.")
+            elif isinstance(node, ast.Import):
+                symbols.extend(("import", alias.name, node.lineno, cell) for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                module = "." * node.level + (node.module or "")
+                symbols.extend(("import", f"{module}.{alias.name}".lstrip("."), node.lineno, cell)
+                               for alias in node.names)
+
+    visit(tree.body, "")
+    return symbols
+
+
+def extract_symbols(content, is_notebook=False):
+    """Símbolos de un .py o de las celdas de código de un .ipynb."""
+    if not is_notebook:
+        return _python_symbols(content)
+    try:
+        cells = json.loads(content).get("cells", [])
+    except (ValueError, AttributeError):
+        return []
+    symbols = []
+    code_cells = (cell for cell in cells if cell.get("cell_type") == "code")
+    for number, cell in enumerate(code_cells):
+        source = cell.get("source", "")
+        if isinstance(source, list):
+            source = "".join(source)
+        symbols.extend(_python_symbols(source, cell=number))
+    return symbols
+
+
+class PathIndex:
+    """Búsqueda por prefijo y difusa sobre las rutas de un árbol.
+
+    Orden de relevancia: nombre exacto, prefijo del nombre, prefijo de la
+    ruta o de uno de sus componentes, subcadena y, por último, subsecuencia
+    (p. ej. "gcli" encuentra "github_client.py").
+    """
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self._lower = [path.lower() for path in self.paths]
+        # Nombres de archivo ordenados para buscar prefijos con bisect
+        self._names = sorted((path.rpartition("/")[2], i) for i, path in enumerate(self._lower))
+        self._keys = [name for name, _ in self._names]
+
+    def __len__(self):
+        return len(self.paths)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        query = query.strip().lower()
+        if not query:
+            return []
+        scored = {}
+
+        def add(i, score):
+            if score < scored.get(i, (99,))[0]:
+                scored[i] = (score, len(self.paths[i]), self.paths[i])
+
+        start = bisect.bisect_left(self._keys, query)
+        for name, i in self._names[start:]:
+            if not name.startswith(query):
+                break
+            add(i, 0 if name == query or name.rsplit(".", 1)[0] == query else 1)
+        for i, path in enumerate(self._lower):
+            if query in path:
+                add(i, 2 if path.startswith(query) or f"/{query}" in path else 3)
+        if len(scored) < limit:
+            pattern = re.compile(".*?".join(map(re.escape, query)))
+            for i, path in enumerate(self._lower):
+                if i not in scored:
+                    match = pattern.search(path)
+                    if match:
+                        # Cuanto más compacta la coincidencia, mejor
+                        add(i, 4 + (match.end() - match.start()) / 1000)
+        ranked = sorted(scored.values())[:limit]
+        return [path for _, _, path in ranked]
+
+
+class SymbolStore:
+    """Índice de símbolos persistente en SQLite.
+
+    Los símbolos se guardan por blob SHA, así que un commit nuevo solo
+    obliga a analizar los blobs que cambian; cada árbol guarda su lista
+    ruta -> blob para resolver las búsquedas.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def has_tree(self, tree_sha):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM tree_files WHERE tree_sha = ? LIMIT 1",
+                                      (tree_sha,)).fetchone() is not None
+
+    def set_tree(self, tree_sha, files):
+        """Guarda los pares (ruta, blob_sha) de un árbol."""
+        with self._lock:
+            self._conn.executemany("INSERT OR IGNORE INTO tree_files VALUES (?, ?, ?)",
+                                   [(tree_sha, path, sha) for path, sha in files if sha])
+            self._conn.commit()
+
+    def missing_blobs(self, tree_sha):
+        """(ruta, blob_sha) del árbol cuyos blobs aún no se han analizado."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT path, blob_sha FROM tree_files WHERE tree_sha = ? AND blob_sha NOT IN "
+                "(SELECT blob_sha FROM blobs) ORDER BY path", (tree_sha,)).fetchall()
+
+    def add_blob(self, blob_sha, symbols):
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO blobs VALUES (?)", (blob_sha,))
+            self._conn.execute("DELETE FROM symbols WHERE blob_sha = ?", (blob_sha,))
+            self._conn.executemany(
+                "INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?)",
+                [(blob_sha, kind, name, name.lower(), line, cell)
+                 for kind, name, line, cell in symbols])
+            self._conn.commit()
+
+    def progress(self, tree_sha):
+        """(blobs analizados, blobs totales) de un árbol."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(b.blob_sha), COUNT(*) FROM tree_files f "
+                "LEFT JOIN blobs b ON b.blob_sha = f.blob_sha WHERE f.tree_sha = ?",
+                (tree_sha,)).fetchone()
+
+    def search(self, tree_sha, query, limit=DEFAULT_LIMIT):
+        """Símbolos del árbol cuyo nombre (o último componente) contiene `query`.
+
+        Devuelve (tipo, nombre, ruta, línea, celda); primero los que empiezan
+        por `query`.
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._lock:
+            return self._conn.execute(
+                "SELECT s.kind, s.name, f.path, s.line, s.cell FROM symbols s "
+                "JOIN tree_files f ON f.blob_sha = s.blob_sha AND f.tree_sha = ? "
+                "WHERE s.name_lower LIKE ? ESCAPE '\\' "
+                "ORDER BY (s.name_lower NOT LIKE ? ESCAPE '\\' AND s.name_lower NOT LIKE ? ESCAPE '\\'), "
+                "s.kind = 'import', length(s.name), f.path LIMIT ?",
+                (tree_sha, f"%{escaped}%", f"{escaped}%", f"%.{escaped}%", limit)).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+
+
+def get_symbol_store():
+    """Devuelve el índice de símbolos compartido del proceso."""
+    global _store
+    if _store is None:
+        _store = SymbolStore()
+    return _store
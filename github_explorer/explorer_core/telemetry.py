@@ -0,0 +1,223 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Nivel de log; por defecto WARNING para que las rutas calientes no escriban nada
+LOG_LEVEL = os.getenv("EXPLORER_LOG_LEVEL", "WARNING")
+# Exportación de métricas: endpoint Prometheus y/o volcado periódico a fichero
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_DUMP_PATH = os.getenv("METRICS_DUMP_PATH")
+METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", "60"))
+
+# Límites (segundos) de los histogramas de duración
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+DESCRIPTIONS = {
+    "explorer_span_seconds": "Duración de las operaciones instrumentadas",
+    "github_requests_total": "Peticiones HTTP enviadas a GitHub",
+    "github_response_bytes_total": "Bytes recibidos de GitHub",
+    "github_cache_total": "Consultas a la caché HTTP de GitHub por resultado",
+    "github_rate_waits_total": "Esperas por cuota de GitHub agotada",
+    "github_rate_wait_seconds_total": "Tiempo esperado por cuota de GitHub",
+    "github_coalesced_total": "Peticiones agrupadas con otra idéntica en curso",
+    "llm_requests_total": "Llamadas al LLM por resultado",
+    "llm_tokens_total": "Tokens estimados enviados y recibidos del LLM",
+    "llm_retries_total": "Reintentos del LLM tras un 429",
+    "llm_rate_wait_seconds_total": "Tiempo esperado en el limitador del LLM",
+    "annotation_cache_total": "Consultas a la caché de anotaciones por resultado",
+    "notebook_cell_cache_total": "Celdas de notebook servidas desde la caché de HTML",
+    "notebook_pack_total": "Lotes de celdas pequeñas separados o reanotados celda a celda",
+    "symbol_index_blobs_total": "Blobs analizados para el índice de símbolos por resultado",
+}
+
+log = logging.getLogger("github_explorer")
+
+
+def configure_logging(level=LOG_LEVEL):
+    """Configura el formato y el nivel de los logs del explorador."""
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    log.setLevel(level.upper())
+
+
+def _labels_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Registro de contadores e histogramas en memoria, seguro entre hilos.
+
+    Se exporta en formato de texto de Prometheus con `render`.
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(value)
+
+    def snapshot(self):
+        """Contadores y, por histograma, número de observaciones y suma."""
+        with self._lock:
+            counters = {f"{name}{_format_labels(key)}": value
+                        for (name, key), value in self._counters.items()}
+            histograms = {f"{name}{_format_labels(key)}": {"count": h.count, "sum": h.sum}
+                          for (name, key), h in self._histograms.items()}
+        return {"counters": counters, "histograms": histograms}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self):
+        """Métricas en formato de texto de Prometheus."""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            buckets = {key: (list(h.buckets), h.sum, h.count) for key, h in histograms}
+        seen = set()
+        for (name, key), value in counters:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {DESCRIPTIONS.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_format_labels(key)} {value:g}")
+        for (name, key), (counts, total, count) in buckets.items():
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {DESCRIPTIONS.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+            for bound, n in zip(BUCKETS, counts):
+                lines.append(f"{name}_bucket{_format_labels(key, [('le', f'{bound:g}')])} {n}")
+            lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+            lines.append(f"{name}_sum{_format_labels(key)} {total:.6f}")
+            lines.append(f"{name}_count{_format_labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def span(name, **labels):
+    """Mide la duración de un bloque en `explorer_span_seconds{span=name}`.
+
+    Las etiquetas solo van al log (con nivel DEBUG), no a la métrica, para no
+    multiplicar las series con rutas o nombres de repositorio.
+    """
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.observe("explorer_span_seconds", elapsed, span=name, status=status)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("span %s %.1fms %s %s", name, elapsed * 1000, status, labels or "")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port=METRICS_PORT, host="0.0.0.0"):
+    """Sirve `/metrics` en un hilo en segundo plano y devuelve el servidor."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    log.info("Metrics endpoint on http://%s:%d/metrics", host, server.server_address[1])
+    return server
+
+
+def dump_metrics(path):
+    """Escribe las métricas en `path` de forma atómica."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(metrics.render())
+    os.replace(tmp_path, path)
+
+
+def start_metrics_dump(path=METRICS_DUMP_PATH, interval=METRICS_DUMP_INTERVAL):
+    """Vuelca las métricas a `path` cada `interval` segundos en segundo plano."""
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                dump_metrics(path)
+            except OSError as e:
+                log.warning("Could not dump metrics to %s: %s", path, e)
+
+    thread = threading.Thread(target=loop, name="metrics-dump", daemon=True)
+    thread.start()
+    return thread
+
+
+_exporters_started = False
+
+
+def start_exporters():
+    """Arranca el endpoint y el volcado periódico configurados por entorno."""
+    global _exporters_started
+    if _exporters_started:
+        return
+    _exporters_started = True
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+    if METRICS_DUMP_PATH:
+        start_metrics_dump(METRICS_DUMP_PATH, METRICS_DUMP_INTERVAL)
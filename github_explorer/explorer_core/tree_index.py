@@ -0,0 +1,175 @@
+import os
+import threading
+from collections import OrderedDict
+
+EXTENSIONS = (".py", ".ipynb")
+MAX_INDEXES = 32
+MAX_BLOB_SHAS = int(os.getenv("BLOB_SHA_ENTRIES", "50000"))
+
+
+class TreeIndex:
+    """Índice compacto de los archivos .py/.ipynb de un árbol de GitHub.
+
+    Cada directorio guarda sus subdirectorios y archivos (un trie por
+    componentes de ruta). Los directorios de un árbol truncado se cargan bajo
+    demanda con `loader(tree_sha)`, que devuelve las entradas no recursivas.
+    Es seguro entre hilos: la UI abre directorios mientras el indexador de
+    símbolos lo recorre.
+    """
+
+    def __init__(self, sha, loader=None, extensions=EXTENSIONS):
+        self.sha = sha
+        self.loader = loader
+        self.extensions = extensions
+        self.truncated = False
+        # ruta del directorio -> ({subdirectorio: sha}, {archivo: sha})
+        self._dirs = {"": ({}, {})}
+        # directorios aún no cargados -> sha de su árbol
+        self._pending = {}
+        self._listings = {}
+        # Reentrante: children() carga el directorio con el lock tomado
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_tree(cls, data, loader=None):
+        """Construye el índice a partir de la respuesta de `git/trees`."""
+        index = cls(data.get("sha"), loader)
+        if data.get("truncated") and loader is not None:
+            # El listado recursivo está incompleto: se recorre nivel a nivel
+            index.truncated = True
+            index._pending[""] = data.get("sha")
+        else:
+            index._add_recursive(data.get("tree", []))
+        return index
+
+    def _ensure_dir(self, path):
+        # Registra `path` y sus ancestros; se detiene en el primero ya conocido
+        node = self._dirs.get(path)
+        if node is not None:
+            return node
+        node = self._dirs[path] = ({}, {})
+        while path:
+            parent, _, name = path.rpartition("/")
+            known = parent in self._dirs
+            self._dirs.setdefault(parent, ({}, {}))[0].setdefault(name, None)
+            if known:
+                break
+            path = parent
+        return node
+
+    def _add_recursive(self, entries):
+        for item in entries:
+            if item["type"] == "blob" and item["path"].endswith(self.extensions):
+                parent, _, name = item["path"].rpartition("/")
+                self._ensure_dir(parent)[1][name] = item.get("sha")
+
+    def _add_level(self, path, entries):
+        dirs, files = self._dirs.setdefault(path, ({}, {}))
+        for item in entries:
+            name = item["path"].rpartition("/")[2]
+            full = f"{path}/{name}" if path else name
+            if item["type"] == "tree":
+                dirs[name] = item.get("sha")
+                self._dirs.setdefault(full, ({}, {}))
+                self._pending[full] = item.get("sha")
+            elif item["type"] == "blob" and name.endswith(self.extensions):
+                files[name] = item.get("sha")
+
+    def _load(self, path):
+        sha = self._pending.pop(path, None)
+        if sha is None or self.loader is None:
+            return
+        entries = self.loader(sha)
+        if entries is not None:
+            self._add_level(path, entries)
+        self._listings.pop(path, None)
+
+    def children(self, path=""):
+        """Devuelve (subdirectorios, [(archivo, sha)]) ordenados de `path`."""
+        path = path.strip("/")
+        with self._lock:
+            if path in self._pending:
+                self._load(path)
+            listing = self._listings.get(path)
+            if listing is None:
+                dirs, files = self._dirs.get(path, ({}, {}))
+                listing = (sorted(dirs), sorted(files.items()))
+                self._listings[path] = listing
+            return listing
+
+    def blob_sha(self, path):
+        parent, _, name = path.rpartition("/")
+        with self._lock:
+            return self._dirs.get(parent, ({}, {}))[1].get(name)
+
+    def files(self):
+        """(ruta, sha) de todos los archivos cargados, en orden."""
+        with self._lock:
+            return sorted((f"{d}/{name}" if d else name, sha)
+                          for d, (_, files) in self._dirs.items() for name, sha in files.items())
+
+    def paths(self):
+        """Rutas de todos los archivos cargados, en orden."""
+        return [path for path, _ in self.files()]
+
+    def __contains__(self, path):
+        return self.blob_sha(path) is not None
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(files) for _, files in self._dirs.values())
+
+
+class TreeIndexCache:
+    """Índices ya construidos, uno por árbol (LRU en memoria, seguro entre hilos)."""
+
+    def __init__(self, max_entries=MAX_INDEXES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            index = self._data.get(key)
+            if index is not None:
+                self._data.move_to_end(key)
+            return index
+
+    def put(self, key, index):
+        with self._lock:
+            self._data[key] = index
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+class BlobShaMap:
+    """URL de archivo -> SHA de su blob, acotado (LRU) y seguro entre hilos.
+
+    Lo rellenan los listados de árboles y lo consultan las descargas para
+    usar el almacén local y la caché inmutable por SHA.
+    """
+
+    def __init__(self, max_entries=MAX_BLOB_SHAS):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            sha = self._data.get(url)
+            if sha is not None:
+                self._data.move_to_end(url)
+            return sha
+
+    def put(self, url, sha):
+        if not sha:
+            return
+        with self._lock:
+            self._data[url] = sha
+            self._data.move_to_end(url)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,240 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import zlib
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (WRITES_IDX_MAP, BaseCheckpointSaver,
+                                       CheckpointTuple, get_checkpoint_id)
+from langgraph.constants import TASKS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE INDEX IF NOT EXISTS checkpoints_created ON checkpoints (thread_id, created_at);
+"""
+
+# Payloads above this size are zlib-compressed before being stored
+COMPRESS_MIN_BYTES = 512
+
+
+class SqliteCheckpointer(BaseCheckpointSaver):
+    """Disk-backed LangGraph checkpointer on a single SQLite file.
+
+    Checkpoints and pending writes are serialized with the graph's serde and
+    zlib-compressed when large. Only the newest `keep_last` checkpoints of
+    each thread are kept, so long-lived threads don't grow without bound, and
+    `prune_threads` drops threads that have been idle for too long.
+    """
+
+    def __init__(self, path="orchestrator_checkpoints.sqlite", keep_last=20, serde=None):
+        super().__init__(serde=serde)
+        self.keep_last = keep_last
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    # Serialization
+
+    def _dump(self, obj):
+        type_, data = self.serde.dumps_typed(obj)
+        if len(data) >= COMPRESS_MIN_BYTES:
+            return f"z:{type_}", zlib.compress(data)
+        return type_, data
+
+    def _load(self, type_, data):
+        if type_.startswith("z:"):
+            return self.serde.loads_typed((type_[2:], zlib.decompress(data)))
+        return self.serde.loads_typed((type_, data))
+
+    # Sync API
+
+    def get_tuple(self, config: RunnableConfig):
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        with self.lock:
+            if checkpoint_id:
+                row = self.conn.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id)).fetchone()
+            else:
+                row = self.conn.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns)).fetchone()
+            if row is None:
+                return None
+            return self._to_tuple(thread_id, checkpoint_ns, row)
+
+    def _to_tuple(self, thread_id, checkpoint_ns, row):
+        # Called with the lock held
+        checkpoint_id, parent_id, type_, blob, metadata_type, metadata = row
+        checkpoint = self._load(type_, blob)
+        writes = self.conn.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id)).fetchall()
+        if "pending_sends" in checkpoint and parent_id:
+            # Older checkpoint formats rebuild Send() packets from the parent's writes
+            sends = self.conn.execute(
+                "SELECT type, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? "
+                "AND checkpoint_id = ? AND channel = ? ORDER BY task_id, idx",
+                (thread_id, checkpoint_ns, parent_id, TASKS)).fetchall()
+            checkpoint = {**checkpoint, "pending_sends": [self._load(t, v) for t, v in sends]}
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                     "checkpoint_id": checkpoint_id}},
+            checkpoint=checkpoint,
+            metadata=self._load(metadata_type, metadata),
+            parent_config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                            "checkpoint_id": parent_id}} if parent_id else None,
+            pending_writes=[(task_id, channel, self._load(t, v)) for task_id, channel, t, v in writes],
+        )
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        query = ("SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, "
+                 "checkpoint, metadata_type, metadata FROM checkpoints")
+        clauses, params = [], []
+        if config is not None:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(get_checkpoint_id(config))
+        if before is not None:
+            clauses.append("checkpoint_id < ?")
+            params.append(get_checkpoint_id(before))
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        returned = 0
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and returned >= limit:
+                break
+            with self.lock:
+                item = self._to_tuple(thread_id, checkpoint_ns, row)
+            if filter and any(item.metadata.get(k) != v for k, v in filter.items()):
+                continue
+            returned += 1
+            yield item
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, blob = self._dump(checkpoint)
+        metadata_type, metadata_blob = self._dump(metadata)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                 type_, blob, metadata_type, metadata_blob, time.time()))
+            self._prune_thread(thread_id, checkpoint_ns)
+            self.conn.commit()
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                 "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # Special channels (errors, interrupts...) overwrite; regular writes are idempotent
+        verb = "REPLACE" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "IGNORE"
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, blob = self._dump(value)
+            rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id,
+                         WRITES_IDX_MAP.get(channel, idx), channel, type_, blob))
+        with self.lock:
+            self.conn.executemany(f"INSERT OR {verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.commit()
+
+    # Retention
+
+    def _prune_thread(self, thread_id, checkpoint_ns):
+        # Called with the lock held: keep the newest `keep_last` checkpoints, and the
+        # writes of those checkpoints and of their parents (needed to resume them)
+        if not self.keep_last:
+            return
+        args = (thread_id, checkpoint_ns)
+        self.conn.execute(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN "
+            "(SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT ?)", args + args + (self.keep_last,))
+        self.conn.execute(
+            "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? "
+            "AND checkpoint_id NOT IN (SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?) "
+            "AND checkpoint_id NOT IN (SELECT parent_checkpoint_id FROM checkpoints WHERE thread_id = ? "
+            "AND checkpoint_ns = ? AND parent_checkpoint_id IS NOT NULL)", args + args + args)
+
+    def delete_thread(self, thread_id):
+        """Remove every checkpoint and write of a thread."""
+        with self.lock:
+            self.conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self.conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+            self.conn.commit()
+
+    def prune_threads(self, max_age_seconds):
+        """Remove threads whose last checkpoint is older than `max_age_seconds`."""
+        cutoff = time.time() - max_age_seconds
+        with self.lock:
+            stale = [row[0] for row in self.conn.execute(
+                "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(created_at) < ?",
+                (cutoff,))]
+            for thread_id in stale:
+                self.conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                self.conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+            self.conn.commit()
+            if stale:
+                # Give the freed pages back to the filesystem
+                self.conn.execute("VACUUM")
+        return len(stale)
+
+    # Async API (runs the sync methods in a worker thread)
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)